@@ -1,4 +1,13 @@
 import unittest
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+Position = Tuple[int, int]
+# start, end and the number of steps the wire took to reach the start
+Segment = Tuple[Position, Position, int]
+
+DIRECTIONS: Dict[str, Position] = {"U": (0, 1), "D": (0, -1), "R": (1, 0), "L": (-1, 0)}
 
 puzzle_input = [
     [
@@ -642,12 +651,112 @@ def code_to_coordinates(wire):
     return coords
 
 
+def code_to_segments(wire) -> List[Segment]:
+    """
+    Transform wire language to a list of straight segments, one per action
+    :param wire: list of actions / directions the wire performs
+    :return: segments, list of (start, end, steps to reach start)
+    """
+    segments = []
+    position, steps = (0, 0), 0
+    for action in wire:
+        direction, length = DIRECTIONS[action[0]], int(action[1:])
+        end = (position[0] + direction[0] * length, position[1] + direction[1] * length)
+        segments.append((position, end, steps))
+        position, steps = end, steps + length
+    return segments
+
+
+def steps_to(segment: Segment, position: Position) -> int:
+    """number of steps the wire needs to reach position on the segment"""
+    start, _, steps = segment
+    return steps + abs(position[0] - start[0]) + abs(position[1] - start[1])
+
+
+def _is_vertical(segment: Segment) -> bool:
+    return segment[0][0] == segment[1][0] and segment[0][1] != segment[1][1]
+
+
+def _crossings(
+    horizontals: List[Segment], verticals: List[Segment]
+) -> Iterator[Tuple[Position, Segment, Segment]]:
+    """
+    Sweep-line from left to right over the perpendicular segments.
+    The horizontal segments are active between their x values, every vertical segment queries the active ones
+    :return: crossing points with the crossing horizontal and vertical segment
+    """
+    events = []
+    for i, (start, end, _) in enumerate(horizontals):
+        events.append((min(start[0], end[0]), 0, i))  # add
+        events.append((max(start[0], end[0]), 2, i))  # remove
+    for i, (start, _, _) in enumerate(verticals):
+        events.append((start[0], 1, i))  # query
+    events.sort()
+    active: List[Tuple[int, int]] = []  # sorted (y, index of horizontal)
+    for x, event, i in events:
+        if event == 0:
+            insort(active, (horizontals[i][0][1], i))
+        elif event == 2:
+            del active[bisect_left(active, (horizontals[i][0][1], i))]
+        else:
+            (_, y1), (_, y2), _ = verticals[i]
+            y_min, y_max = min(y1, y2), max(y1, y2)
+            for j in range(bisect_left(active, (y_min, -1)), len(active)):
+                y, k = active[j]
+                if y > y_max:
+                    break
+                yield (x, y), horizontals[k], verticals[i]
+
+
+def _overlaps(
+    segments1: List[Segment], segments2: List[Segment], axis: int
+) -> Iterator[Tuple[Position, Segment, Segment]]:
+    """
+    Points where parallel segments of both wires lay on top of each other
+    :param axis: 0 for horizontal segments (same y), 1 for vertical segments (same x)
+    """
+    lines: Dict[int, List[Tuple[int, int, int, Segment]]] = defaultdict(list)
+    for wire, segments in enumerate([segments1, segments2]):
+        for segment in segments:
+            start, end, _ = segment
+            lo, hi = sorted((start[axis], end[axis]))
+            lines[start[1 - axis]].append((lo, hi, wire, segment))
+    for fixed, intervals in lines.items():
+        intervals.sort(key=lambda interval: interval[0])
+        for i, (lo, hi, wire, segment) in enumerate(intervals):
+            for other_lo, other_hi, other_wire, other in intervals[i + 1 :]:
+                if other_lo > hi:
+                    break
+                if other_wire == wire:
+                    continue
+                for value in range(other_lo, min(hi, other_hi) + 1):
+                    position = (value, fixed) if axis == 0 else (fixed, value)
+                    yield (position, segment, other) if wire == 0 else (position, other, segment)
+
+
+def wire_intersections(wire1, wire2) -> Iterator[Tuple[Position, int, int]]:
+    """
+    All points where the wires meet, including the central port, possibly multiple times
+    :return: intersection point and the steps both wires need to get there
+    """
+    segments1, segments2 = code_to_segments(wire1), code_to_segments(wire2)
+    vertical1 = [segment for segment in segments1 if _is_vertical(segment)]
+    horizontal1 = [segment for segment in segments1 if not _is_vertical(segment)]
+    vertical2 = [segment for segment in segments2 if _is_vertical(segment)]
+    horizontal2 = [segment for segment in segments2 if not _is_vertical(segment)]
+    for position, horizontal, vertical in _crossings(horizontal1, vertical2):
+        yield position, steps_to(horizontal, position), steps_to(vertical, position)
+    for position, horizontal, vertical in _crossings(horizontal2, vertical1):
+        yield position, steps_to(vertical, position), steps_to(horizontal, position)
+    for axis, first, second in [(0, horizontal1, horizontal2), (1, vertical1, vertical2)]:
+        for position, segment1, segment2 in _overlaps(first, second, axis):
+            yield position, steps_to(segment1, position), steps_to(segment2, position)
+
+
 def find_intersections(wire1, wire2):
     """Find all the intersection points of two wires, excluding (0, 0)"""
-    coords1 = set(code_to_coordinates(wire1))
-    coords2 = set(code_to_coordinates(wire2))
-    intersections = coords1 & coords2  # find where both sets are equal
-    intersections.remove((0, 0))
+    intersections = {position for position, _, _ in wire_intersections(wire1, wire2)}
+    intersections.discard((0, 0))
     return intersections
 
 
@@ -658,13 +767,14 @@ def manhattan_distance(wire1, wire2):
 
 
 def combined_step_distance(wire1, wire2):
-    """Calculate the combined step distance of two given wires"""
-    coords1 = code_to_coordinates(wire1)
-    coords2 = code_to_coordinates(wire2)
-    intersections = find_intersections(wire1, wire2)
+    """
+    Calculate the combined step distance of two given wires.
+    The minimum over all crossing segments equals the sum of the first visits of both wires.
+    """
     return min(
-        coords1.index(intersection) + coords2.index(intersection)
-        for intersection in intersections
+        steps1 + steps2
+        for position, steps1, steps2 in wire_intersections(wire1, wire2)
+        if position != (0, 0)
     )
 
 
@@ -679,10 +789,22 @@ class Test2019Day03(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(code_to_coordinates(wire), coordinates)
 
+    def test_code_to_segments(self):
+        for wire, segments in [
+            [["U3"], [((0, 0), (0, 3), 0)]],
+            [["R1", "D1"], [((0, 0), (1, 0), 0), ((1, 0), (1, -1), 1)]],
+            [["L1", "R0", "L1"], [((0, 0), (-1, 0), 0), ((-1, 0), (-1, 0), 1), ((-1, 0), (-2, 0), 1)]],
+        ]:
+            with self.subTest():
+                self.assertEqual(code_to_segments(wire), segments)
+
     def test_intersection_finder(self):
         for wire1, wire2, intersections in [
             [["U3"], ["D3"], set()],
             [["U3"], ["U3"], {(0, 1), (0, 2), (0, 3)}],
+            [["R2", "U4"], ["U2", "R3"], {(2, 2)}],
+            [["R4"], ["R1", "U1", "R2", "D2", "L2", "U1"], {(1, 0), (3, 0)}],
+            [["R1", "U1", "R2", "D2", "L2", "U1"], ["R4"], {(1, 0), (3, 0)}],
         ]:
             with self.subTest():
                 self.assertSetEqual(find_intersections(wire1, wire2), intersections)
@@ -743,6 +865,10 @@ class Test2019Day03(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(combined_step_distance(wire1, wire2), distance)
 
+    def test_final_results(self):
+        self.assertEqual(manhattan_distance(puzzle_input[0], puzzle_input[1]), 870)
+        self.assertEqual(combined_step_distance(puzzle_input[0], puzzle_input[1]), 13698)
+
 
 if __name__ == "__main__":
     print("1: ", manhattan_distance(puzzle_input[0], puzzle_input[1]))
@@ -1,5 +1,6 @@
 import unittest
 
+from functools import lru_cache
 from itertools import groupby
 
 puzzle_input = (136818, 685979)
@@ -57,12 +58,68 @@ def number_meets_criteria_2(num):
     )
 
 
+@lru_cache(maxsize=None)
+def _count_completions(remaining, last, run, pair, exact):
+    """Returns (part 1, part 2) counts of non-decreasing completions after digit last
+
+    run is the length of the current group of last (capped at 3), pair marks that some
+    group reached two digits and exact that a finished group had exactly two digits.
+    """
+    if remaining == 0:
+        return int(pair or run >= 2), int(exact or run == 2)
+    count_1 = count_2 = 0
+    for digit in range(last, 10):
+        c_1, c_2 = _count_completions(
+            remaining - 1, digit, *_next_state(last, run, pair, exact, digit)
+        )
+        count_1 += c_1
+        count_2 += c_2
+    return count_1, count_2
+
+
+def _next_state(last, run, pair, exact, digit):
+    """Returns the (run, pair, exact) state after appending digit"""
+    if digit == last:
+        return min(run + 1, 3), pair or run >= 1, exact
+    return 1, pair, exact or run == 2
+
+
+def _count_below(bound, digits):
+    """Returns (part 1, part 2) counts of valid numbers with digits digits below bound"""
+    bound = min(max(bound, 10 ** (digits - 1)), 10 ** digits)
+    if bound == 10 ** digits:
+        # a leading zero would shorten the number, so the sequence starts at 1
+        return _count_completions(digits, 1, 0, False, False)
+    count_1 = count_2 = 0
+    last, run, pair, exact = 0, 0, False, False
+    for position, bound_digit in enumerate(map(int, str(bound))):
+        # digits below the bound leave the rest of the number free
+        for digit in range(max(last, 1 if position == 0 else 0), bound_digit):
+            state = _next_state(last, run, pair, exact, digit)
+            c_1, c_2 = _count_completions(digits - position - 1, digit, *state)
+            count_1 += c_1
+            count_2 += c_2
+        if bound_digit < last:
+            break
+        run, pair, exact = _next_state(last, run, pair, exact, bound_digit)
+        last = bound_digit
+    return count_1, count_2
+
+
+def count_passwords(start, stop, digits=6):
+    """Returns the (part 1, part 2) number of passwords with digits digits in range(start, stop)
+
+    Instead of checking every number, only non-decreasing digit sequences are counted.
+    """
+    below_stop = _count_below(stop, digits)
+    below_start = _count_below(start, digits)
+    return below_stop[0] - below_start[0], below_stop[1] - below_start[1]
+
+
 def how_many_correct_in_puzzle_range(part):
     """Returns the number of correct numbers withing puzzle_range"""
-    if part == 1:
-        return sum(1 for num in range(*puzzle_input) if number_meets_criteria_1(num))
-    elif part == 2:
-        return sum(1 for num in range(*puzzle_input) if number_meets_criteria_2(num))
+    if part in (1, 2):
+        return count_passwords(*puzzle_input)[part - 1]
 
 
 class Test2019Day04(unittest.TestCase):
@@ -116,6 +173,44 @@ class Test2019Day04(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(criteria_no_larger_group(number), meets)
 
+    def test_count_passwords(self):
+        for start, stop in [
+            (100000, 101000),
+            (111000, 112500),
+            (111111, 111112),
+            (566000, 567000),
+            (899000, 900100),
+            (999000, 1000001),
+        ]:
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual(
+                    count_passwords(start, stop),
+                    (
+                        sum(
+                            1
+                            for num in range(start, stop)
+                            if criteria_six_digit(num)
+                            and criteria_non_decreasing_sequence(num)
+                            and criteria_two_adjacent_digits(num)
+                        ),
+                        sum(
+                            1
+                            for num in range(start, stop)
+                            if criteria_six_digit(num)
+                            and criteria_non_decreasing_sequence(num)
+                            and criteria_no_larger_group(num)
+                        ),
+                    ),
+                )
+
+    def test_puzzle_counts(self):
+        self.assertEqual(how_many_correct_in_puzzle_range(1), 1919)
+        self.assertEqual(how_many_correct_in_puzzle_range(2), 1291)
+        self.assertTupleEqual(count_passwords(*puzzle_input), (1919, 1291))
+        # all six digit numbers, and ranges that are clipped to them
+        self.assertTupleEqual(count_passwords(100000, 1000000), (2919, 2046))
+        self.assertTupleEqual(count_passwords(0, 10**7), (2919, 2046))
+
 
 if __name__ == "__main__":
     print("1: ", how_many_correct_in_puzzle_range(1))
@@ -1,4 +1,6 @@
 import unittest
+from collections import defaultdict, deque
+from typing import Dict, List
 
 puzzle_input = [
     "NKB)PZS",
@@ -1332,22 +1334,67 @@ def map_to_dict(orbit_map):
 
 
 def recursive_orbits(orbiting_object, orbits, number=0):
-    """calculate the total number of orbits of one orbiting object, direct and indirect"""
+    """
+    calculate the total number of orbits of one orbiting object, direct and indirect
+    walks the whole ancestor chain, the OrbitTree has the depths as lookup table
+    """
     if orbiting_object in orbits.keys():
         number += 1
-        # TODO: Save calculated recursions as lookup table for later use
         return sum(recursive_orbits(x, orbits, number) for x in orbits[orbiting_object])
     else:
         return number
 
 
+class OrbitTree:
+    """
+    Index of an orbit map, built once in linear time.
+    Holds the parent of every object, the children as adjacency list and the depth (number of orbits) of every object.
+    """
+
+    def __init__(self, orbit_map):
+        self.parent: Dict[str, str] = {}
+        self.children: Dict[str, List[str]] = defaultdict(list)
+        for orbit in orbit_map:
+            a, b = orbit.split(")")
+            if b in self.parent:
+                raise ValueError("{} can not orbit {} and {}".format(b, self.parent[b], a))
+            self.parent[b] = a
+            self.children[a].append(b)
+        # breadth first from the objects that do not orbit anything, no recursion for long chains
+        roots = [obj for obj in self.children if obj not in self.parent]
+        self.depth: Dict[str, int] = dict.fromkeys(roots, 0)
+        queue = deque(roots)
+        while queue:
+            obj = queue.popleft()
+            for child in self.children.get(obj, []):
+                self.depth[child] = self.depth[obj] + 1
+                queue.append(child)
+        if len(self.depth) != len(self.parent) + len(roots):
+            raise ValueError("The orbit map contains a cycle")
+
+    def total_orbits(self) -> int:
+        """total number of direct and indirect orbits"""
+        return sum(self.depth.values())
+
+    def lowest_common_ancestor(self, a: str, b: str) -> str:
+        """the deepest object both a and b (indirectly) orbit, or are"""
+        while self.depth[a] > self.depth[b]:
+            a = self.parent[a]
+        while self.depth[b] > self.depth[a]:
+            b = self.parent[b]
+        while a != b:
+            a, b = self.parent[a], self.parent[b]
+        return a
+
+    def transfers(self, start: str, goal: str) -> int:
+        """number of orbital transfers to get from the object start orbits to the object goal orbits"""
+        a, b = self.parent[start], self.parent[goal]
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lowest_common_ancestor(a, b)]
+
+
 def nof_orbits(orbit_map):
     """Calculate the total number of direct and indirect orbits of a given orbit map"""
-    number = 0
-    orbits = map_to_dict(orbit_map)
-    for orbit in orbits.keys():
-        number += recursive_orbits(orbit, orbits)
-    return number
+    return OrbitTree(orbit_map).total_orbits()
 
 
 def neighboring_orbits(orbiting_object, orbits):
@@ -1363,20 +1410,7 @@ def neighboring_orbits(orbiting_object, orbits):
 
 def nof_orbital_transfers(orbit_map, start="YOU", goal="SAN"):
     """Calculate the total number of orbit transfers to perform to get from start to goal"""
-    orbits = map_to_dict(orbit_map)
-    current_possible_orbits = [start]
-    i = -1
-    while goal not in current_possible_orbits:
-        i += 1
-        # unpack all the orbits in current list
-        current_possible_orbits = [
-            neighboring_orbits(x, orbits) for x in current_possible_orbits
-        ]
-        # flatten list
-        current_possible_orbits = list(
-            set([item for sublist in current_possible_orbits for item in sublist])
-        )
-    return i - 1
+    return OrbitTree(orbit_map).transfers(start, goal)
 
 
 class Test2019Day06(unittest.TestCase):
@@ -1472,6 +1506,34 @@ class Test2019Day06(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(nof_orbital_transfers(o_map), result)
 
+    def test_orbit_tree(self):
+        tree = OrbitTree(["COM)B", "B)C", "C)D", "B)G", "G)H", "D)YOU", "H)SAN"])
+        self.assertDictEqual(
+            tree.children,
+            {"COM": ["B"], "B": ["C", "G"], "C": ["D"], "G": ["H"], "D": ["YOU"], "H": ["SAN"]},
+        )
+        self.assertEqual(tree.depth["YOU"], 4)
+        self.assertEqual(tree.lowest_common_ancestor("YOU", "SAN"), "B")
+        self.assertEqual(tree.lowest_common_ancestor("C", "YOU"), "C")
+        self.assertEqual(tree.transfers("YOU", "SAN"), 4)
+
+    def test_orbit_tree_long_chain(self):
+        n = 200000
+        orbit_map = ["{}){}".format(i, i + 1) for i in range(n)] + ["{})YOU".format(n), "10)SAN"]
+        tree = OrbitTree(orbit_map)
+        self.assertEqual(tree.total_orbits(), n * (n + 1) // 2 + n + 1 + 11)
+        self.assertEqual(tree.transfers("YOU", "SAN"), n - 10)
+
+    def test_invalid_orbit_maps(self):
+        for orbit_map in [["A)B", "C)B"], ["COM)A", "B)C", "C)B"]]:
+            with self.subTest(msg="orbit_map: {}".format(orbit_map)):
+                with self.assertRaises(ValueError):
+                    OrbitTree(orbit_map)
+
+    def test_final_results(self):
+        self.assertEqual(nof_orbits(puzzle_input), 154386)
+        self.assertEqual(nof_orbital_transfers(puzzle_input), 346)
+
 
 if __name__ == "__main__":
     print("1: ", nof_orbits(puzzle_input))
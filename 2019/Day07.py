@@ -1,7 +1,11 @@
+import os
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from itertools import permutations
+from typing import Iterable, List, Optional, Tuple
 
-from Day05 import run_intcode_program
+from intcode import IntcodeNetwork, run_intcode_program
 
 puzzle_input = [
     3,
@@ -547,67 +551,90 @@ def get_feedback_loop_score(amp_input: list, sequence: tuple) -> int:
     :param sequence: current sequence to test the output of
     :return: value of the last amplifier at the end of the loop
     """
-    signal = 0
-    amplifiers = [
-        {"in": [], "out": [], "pointer": 0, "code": amp_input.copy()}
-        for _ in range(len(sequence))
-    ]
-    # add init conditions
-    for j, amp in enumerate(amplifiers):
-        amp["in"].append(sequence[j])
-    # input first signal
-    amplifiers[0]["in"].append(signal)
+    # every amplifier gets its phase setting, the first one additionally the first signal
+    initial_inputs = [[phase_value] for phase_value in sequence]
+    initial_inputs[0].append(0)
+    network = IntcodeNetwork.ring([amp_input] * len(sequence), initial_inputs)
+    network.run()
+    # return the last value the last amp sent back to the first one
+    return network.outbound[len(sequence) - 1][0].last
 
-    # run loop until last pointer points to none
-    i_amp = 0
-    while amplifiers[-1]["pointer"] is not None:
-        # get current and last amplifier
-        curr_amp = amplifiers[i_amp]
-        last_amp = amplifiers[(i_amp + 4) % 5]
-        # add output of last amplifier to current input and remove it from last amp
-        curr_amp["in"] += last_amp["out"]
-        last_amp["out"] = []
-        # run next amplifier
-        new_out, new_pointer, _, new_code = run_intcode_program(
-            intcode=curr_amp["code"],
-            program_input=curr_amp["in"],
-            pointer_start=curr_amp["pointer"],
-        )
 
-        # update current amplifier with updated values
-        curr_amp["out"] += new_out
-        curr_amp["pointer"] = new_pointer
-        curr_amp["new_code"] = new_code
+def get_score(program: list, sequence: tuple, feedback_loop: bool = False) -> int:
+    """
+    Get the score of a single phase setting sequence
+    :param program: intcode program
+    :param sequence: current sequence to test the output of
+    :param feedback_loop: whether or not to interpret the amplifiers as feedback loop
+    :return: value of the last amplifier
+    """
+    if feedback_loop:
+        return get_feedback_loop_score(program.copy(), sequence)
+    return get_amplification_score(program.copy(), sequence)
+
+
+def _get_program_score(
+    programs: List[list], feedback_loop: bool, candidate: Tuple[int, tuple]
+) -> int:
+    """score of the candidate (index of the program, sequence), picklable for the process pool"""
+    return get_score(programs[candidate[0]], candidate[1], feedback_loop)
+
 
-        # increase pointer
-        i_amp = (i_amp + 1) % 5
-    # return the las value of the last amp
-    return amplifiers[-1]["out"][-1]
+def _map_scores(
+    programs: List[list],
+    candidates: List[Tuple[int, tuple]],
+    feedback_loop: bool,
+    workers: Optional[int],
+) -> Iterable[int]:
+    """score all candidates in order, either sequentially or spread over a process pool"""
+    score = partial(_get_program_score, programs, feedback_loop)
+    if workers == 1:
+        return list(map(score, candidates))
+    workers = workers or os.cpu_count() or 1
+    # a few large chunks per worker, a single candidate is way too cheap to be sent alone
+    chunksize = max(1, len(candidates) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(score, candidates, chunksize=chunksize))
+
+
+def find_amplifying_sequences(
+    programs: List[list],
+    list_of_amps: list,
+    feedback_loop: bool = False,
+    workers: Optional[int] = None,
+) -> List[Tuple[tuple, int]]:
+    """
+    Batched search, calculate the best amplifying sequence for many programs at once.
+    All (program, sequence) pairs share one process pool, so chains of more than 5 amplifiers are feasible.
+    :param programs: list of intcode programs
+    :param list_of_amps: phase settings of the amplifiers, every permutation is tested
+    :param feedback_loop: whether or not to interpret the amplifiers as feedback loop
+    :param workers: number of processes, 1 runs sequentially, None uses all cpus
+    :return: the best phase setting sequence and its score for every program
+    """
+    sequences = list(permutations(list_of_amps))
+    candidates = [(i, sequence) for i in range(len(programs)) for sequence in sequences]
+    scores = _map_scores(programs, candidates, feedback_loop, workers)
+    results = [((), 0) for _ in programs]
+    for (i, sequence), score in zip(candidates, scores):
+        # update best value and sequence, the first sequence wins on ties
+        if score > results[i][1]:
+            results[i] = (sequence, score)
+    return results
 
 
 def find_amplifying_sequence(
-    amp_input, list_of_amps: list, feedback_loop: bool = False
+    amp_input, list_of_amps: list, feedback_loop: bool = False, workers: Optional[int] = 1
 ) -> (list, int):
     """
     Calculate the best amplifying sequence and highest returning value given an intcode program
     :param amp_input: intcode program
     :param list_of_amps: number of amplifiers used (0-4 -> 5 pc)
     :param feedback_loop: whether or not to interpret the amplifiers as feedback loop
+    :param workers: number of processes to spread the permutations over, 1 runs sequentially, None uses all cpus
     :return: phase setting sequence with highest output
     """
-    combinations = list(permutations(list_of_amps))
-    best = 0
-    best_sequence = ()
-    for combination in combinations:
-        if feedback_loop:
-            score = get_feedback_loop_score(amp_input.copy(), combination)
-        else:
-            score = get_amplification_score(amp_input.copy(), combination)
-        # update best value and sequence
-        if score > best:
-            best = score
-            best_sequence = combination
-    return best_sequence, best
+    return find_amplifying_sequences([amp_input], list_of_amps, feedback_loop, workers)[0]
 
 
 class Test2019Day07(unittest.TestCase):
@@ -803,6 +830,31 @@ class Test2019Day07(unittest.TestCase):
                 self.assertEqual(seq, final_sequence)
                 self.assertEqual(score, max_signal)
 
+    def test_parallel_search(self):
+        for amps, feedback_loop, result in [
+            ([0, 1, 2, 3, 4], False, ((4, 2, 3, 0, 1), 437860)),
+            ([5, 6, 7, 8, 9], True, ((5, 8, 9, 7, 6), 49810599)),
+        ]:
+            with self.subTest(msg="feedback_loop: {}".format(feedback_loop)):
+                self.assertEqual(
+                    find_amplifying_sequence(puzzle_input, amps, feedback_loop, workers=1),
+                    result,
+                )
+                self.assertEqual(
+                    find_amplifying_sequence(puzzle_input, amps, feedback_loop, workers=2),
+                    result,
+                )
+
+    def test_batched_search(self):
+        programs = [
+            [3, 15, 3, 16, 1002, 16, 10, 16, 1, 16, 15, 15, 4, 15, 99, 0, 0],
+            puzzle_input,
+        ]
+        self.assertListEqual(
+            find_amplifying_sequences(programs, [0, 1, 2, 3, 4], workers=2),
+            [((4, 3, 2, 1, 0), 43210), ((4, 2, 3, 0, 1), 437860)],
+        )
+
 
 if __name__ == "__main__":
     print("Start Main 07:")
@@ -811,7 +863,7 @@ if __name__ == "__main__":
     )
     print("1) Best Sequence was {} with a value of {}".format(best_seq, best_value))
     best_seq, best_value = find_amplifying_sequence(
-        puzzle_input.copy(), [5, 6, 7, 8, 9], feedback_loop=True
+        puzzle_input.copy(), [5, 6, 7, 8, 9], feedback_loop=True, workers=None
     )
     print("2) Best Sequence was {} with a value of {}".format(best_seq, best_value))
     print("End Main 07")
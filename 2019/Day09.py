@@ -1,6 +1,6 @@
 import unittest
 
-from Day05 import run_intcode_program
+from intcode import run_intcode_program
 
 puzzle_input = [
     1102,
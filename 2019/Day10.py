@@ -1,7 +1,15 @@
 import unittest
 import math
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from helper.tuple import tuple_dot_tuple, tuple_euclidean_norm, tuple_subtract_tuple
+import numpy as np
+
+from helper.tuple import tuple_dot_tuple, tuple_euclidean_norm
+
+Position = Tuple[int, int]
+# line of sight as reduced integer direction (dx/g, dy/g)
+Direction = Tuple[int, int]
 
 puzzle_input = [
     ".###..#######..####..##...#",
@@ -86,78 +94,95 @@ def get_asteroid_coordinates(star_map):
     return asteroid_list
 
 
+# elements per temporary array of visible_counts, 2 ** 20 int64 values are 8 MB
+CHUNK_ELEMENTS = 1 << 20
+
+
+def reduced_direction(dx: int, dy: int) -> Direction:
+    """direction of the vector (dx, dy) reduced by the greatest common divisor, all asteroids in line share it"""
+    g = math.gcd(dx, dy)
+    return (dx // g, dy // g) if g else (0, 0)
+
+
+def visible_counts(asteroids: np.ndarray, chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Number of other asteroids every asteroid can see, vectorized over chunks of stations.
+    :param asteroids: array of shape (N, 2) with the asteroid coordinates
+    :param chunk_size: number of stations evaluated at once, the temporaries have chunk_size * N elements.
+        By default it is derived from N, so they stay within CHUNK_ELEMENTS elements.
+    :return: array of shape (N,) with the number of distinct reduced directions per asteroid
+    """
+    counts = np.zeros(len(asteroids), dtype=np.int64)
+    if len(asteroids) == 0:
+        return counts
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_ELEMENTS // len(asteroids))
+    xs, ys = asteroids[:, 0].astype(np.int64), asteroids[:, 1].astype(np.int64)
+    span = int(max(np.ptp(xs), np.ptp(ys)))
+    for start in range(0, len(asteroids), chunk_size):
+        dx = xs[None, :] - xs[start : start + chunk_size, None]
+        dy = ys[None, :] - ys[start : start + chunk_size, None]
+        g = np.gcd(dx, dy)
+        g[g == 0] = 1
+        # unique key per direction, the station itself is the only one with direction (0, 0)
+        keys = np.sort((dx // g + span) * (2 * span + 1) + (dy // g + span), axis=1)
+        counts[start : start + chunk_size] = np.count_nonzero(np.diff(keys, axis=1), axis=1)
+    return counts
+
+
 def get_location_value(star_map):
-    """Get the value per location"""
+    """Get the number of visible asteroids per location as rows of text, "." where there is no asteroid"""
     asteroid_list = get_asteroid_coordinates(star_map)
     value_map = list([list(-1 for _ in row) for row in star_map])
-    seen_map = list([list({} for _ in row) for row in star_map])
-    for asteroid in asteroid_list:
-        # dict with arcs in which asteroids are seen with list for each direction with closest to furthest
-        arc_dict = {}
-        for other in asteroid_list:
-            if other != asteroid:
-                # get distance and calculate arc in degrees relative to (0, -1) [up] in 360 degrees
-                distance_vec = tuple_subtract_tuple(other, asteroid)
-                distance = tuple_euclidean_norm(distance_vec)
-                arc = get_two_d_arc_tan_value(distance_vec, (0, -1))
-                if arc in arc_dict.keys():
-                    # save them with their distance into the list
-                    arc_dict[arc].append((distance, other))
-                else:
-                    arc_dict[arc] = list([(distance, other)])
-        # count different keys in dict and change value at position
-        value_map[asteroid[1]][asteroid[0]] = len(arc_dict.keys())
-        seen_map[asteroid[1]][asteroid[0]] = arc_dict
+    for (x, y), count in zip(asteroid_list, visible_counts(np.array(asteroid_list).reshape(-1, 2))):
+        value_map[y][x] = int(count)
     # return . instead of -1 and number for everything else, make sure to space values
-    return (
-        list(
-            [
-                "".join(str(value) + " " if value >= 0 else ". " for value in row)[:-1]
-                for row in value_map
-            ]
-        ),
-        seen_map,
+    return list(
+        ["".join(str(value) + " " if value >= 0 else ". " for value in row)[:-1] for row in value_map]
     )
 
 
+def get_station_targets(station: Position, asteroid_list: List[Position]) -> Dict[Direction, List[Position]]:
+    """all other asteroids grouped by their direction from the station, sorted from closest to furthest"""
+    targets: Dict[Direction, List[Position]] = {}
+    for other in sorted(asteroid_list, key=lambda a: abs(a[0] - station[0]) + abs(a[1] - station[1])):
+        if other != station:
+            targets.setdefault(reduced_direction(other[0] - station[0], other[1] - station[1]), []).append(other)
+    return targets
+
+
 def get_best_location(star_map):
-    location_values, arc_values = get_location_value(star_map)
-    location_values = list(
-        [
-            list(int(value) if value != "." else -1 for value in row.split(" "))
-            for row in location_values
-        ]
-    )
-    best_coord = ()
-    best_value = 0
-    for y, row in enumerate(location_values):
-        for x, value in enumerate(row):
-            if value > best_value:
-                best_value = value
-                best_coord = (x, y)
-    return best_coord, best_value, arc_values[best_coord[1]][best_coord[0]]
+    """best location for the station, its number of visible asteroids and the targets grouped by direction"""
+    asteroid_list = get_asteroid_coordinates(star_map)
+    if not asteroid_list:
+        return (), 0, {}
+    counts = visible_counts(np.array(asteroid_list))
+    # the first maximum in reading order wins
+    best = int(np.argmax(counts))
+    station = asteroid_list[best]
+    return station, int(counts[best]), get_station_targets(station, asteroid_list)
+
+
+def vaporization_order(station_targets: Dict[Direction, List[Position]]) -> Iterator[Position]:
+    """
+    The laser starts pointing up and rotates clockwise, vaporizing the closest asteroid in every direction it hits.
+    Yields the asteroids in the order they are vaporized.
+    """
+    # clockwise angle starting at up, y is pointing down
+    directions = sorted(station_targets, key=lambda d: math.atan2(d[0], -d[1]) % (2 * math.pi))
+    queues = [list(reversed(station_targets[direction])) for direction in directions]
+    while queues:
+        for queue in queues:
+            yield queue.pop()
+        queues = [queue for queue in queues if queue]
 
 
 def get_nth_vaporized(station_arc_values, n):
     """get the nth vaporized asteroid"""
-    # transform dict to tuple to iterate more easily
-    station_arc_values_tuple = []
-    for key in station_arc_values.keys():
-        station_arc_values_tuple.append(
-            ((float(key) + 360) % 360, station_arc_values[key])
-        )
-    station_arc_values_tuple = sorted(station_arc_values_tuple)
-    index = 0
-    i = 1
-    while True:
-        if len(station_arc_values_tuple[index][1]) > 0:
-            # return if end
-            if i == n:
-                return station_arc_values_tuple[index][1][-1][1]
-            # remove the closest item from list (last)
-            station_arc_values_tuple[index][1].pop(-1)
-        index += 1 % (len(station_arc_values_tuple) - 1)
-        i += 1
+    nof_targets = sum(len(targets) for targets in station_arc_values.values())
+    if not 1 <= n <= nof_targets:
+        raise ValueError("Asteroid {} is never vaporized, there are only {} targets".format(n, nof_targets))
+    return next(islice(vaporization_order(station_arc_values), n - 1, None))
 
 
 class Test2019Day10(unittest.TestCase):
@@ -180,7 +205,7 @@ class Test2019Day10(unittest.TestCase):
             ],
         ]:
             with self.subTest():
-                self.assertListEqual(get_location_value(inp)[0], best)
+                self.assertListEqual(get_location_value(inp), best)
 
     def test_output_best_position(self):
         for inp, best in [
@@ -242,6 +267,35 @@ class Test2019Day10(unittest.TestCase):
         self.assertTupleEqual(get_nth_vaporized(best_stations_arcs.copy(), 1), (11, 12))
         self.assertTupleEqual(get_nth_vaporized(best_stations_arcs.copy(), 10), (12, 8))
         self.assertTupleEqual(get_nth_vaporized(best_stations_arcs.copy(), 200), (8, 2))
+        self.assertTupleEqual(get_nth_vaporized(best_stations_arcs.copy(), 299), (11, 1))
+        for n in [0, 300]:
+            with self.subTest(n=n):
+                with self.assertRaises(ValueError):
+                    get_nth_vaporized(best_stations_arcs.copy(), n)
+
+    def test_reduced_direction(self):
+        for vector, direction in [
+            [(0, 0), (0, 0)],
+            [(4, -6), (2, -3)],
+            [(-3, 0), (-1, 0)],
+            [(0, 7), (0, 1)],
+            [(-5, -5), (-1, -1)],
+        ]:
+            with self.subTest(msg="vector: {}".format(vector)):
+                self.assertTupleEqual(reduced_direction(*vector), direction)
+
+    def test_visible_counts_chunks(self):
+        asteroids = np.array(get_asteroid_coordinates(test_input))
+        self.assertListEqual(
+            visible_counts(asteroids, chunk_size=7).tolist(), visible_counts(asteroids).tolist()
+        )
+
+    def test_vaporization_order(self):
+        station_targets = get_best_location(puzzle_input)[2]
+        order = list(vaporization_order(station_targets))
+        self.assertEqual(len(order), sum(len(targets) for targets in station_targets.values()))
+        self.assertEqual(len(set(order)), len(order))
+        self.assertTupleEqual(order[199], (2, 4))
 
 
 if __name__ == "__main__":
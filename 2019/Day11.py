@@ -1,6 +1,9 @@
 import unittest
+from typing import Dict, List, Optional, Tuple
 
-from Day05 import run_intcode_program
+import numpy as np
+
+from intcode import IntcodeMachine
 
 puzzle_input = [
     3,
@@ -641,16 +644,25 @@ puzzle_input = [
 
 class Robot:
     def __init__(
-        self, intcode: list, input_values=None, input_painted=None, draw=False
+        self,
+        intcode: list,
+        input_values=None,
+        input_painted=None,
+        draw=False,
+        keep_history=False,
     ):
-        self.input = [] if input_values is None else list(input_values)
-        self.intcode = intcode.copy()
-        self.code_pointer = 0
-        self.code_relative_base = 0
+        self.machine = IntcodeMachine(intcode)
+        self.machine.add_input([] if input_values is None else input_values)
         self.facing = (0, -1)  # up
         self.position = (0, 0)
-        # tuple of painted panels and their respective color (possible duplicates - ordered)
-        self.painted = [] if input_painted is None else list(input_painted)
+        # current color of every panel that was painted at least once
+        self.panels: Dict[Tuple[int, int], int] = {}
+        # optional log of painted panels and their respective color (possible duplicates - ordered)
+        self.history: Optional[List[Tuple[Tuple[int, int], int]]] = (
+            [] if keep_history else None
+        )
+        for position, color in [] if input_painted is None else input_painted:
+            self.paint(position, color)
         self.draw_final = draw
 
     def run(self):
@@ -658,7 +670,7 @@ class Robot:
         finished = False
         while not finished:
             current_color = self.detect_color(self.position)
-            self.input.append(current_color)
+            self.machine.add_input([current_color])
             output, finished = self.run_intcode_program()
             if finished:
                 if self.draw_final:
@@ -677,17 +689,8 @@ class Robot:
 
     def run_intcode_program(self):
         """run the program with current state until further input is needed"""
-        out, pointer, relative_base, code = run_intcode_program(
-            self.intcode,
-            self.input,
-            pointer_start=self.code_pointer,
-            relative_base_start=self.code_relative_base,
-        )
-        self.input = []  # reset input
-        self.code_pointer = pointer
-        self.code_relative_base = relative_base
-        self.intcode = code
-        return out, pointer is None
+        out = self.machine.run_until_input()
+        return out, self.machine.halted
 
     def move(self, turn_direction):
         """turn in given direction, then step forward 1 tile"""
@@ -706,55 +709,54 @@ class Robot:
 
     def paint(self, position, color):
         """Paint one panel"""
-        self.painted.append((position, color))
+        self.panels[position] = color
+        if self.history is not None:
+            self.history.append((position, color))
 
     def detect_color(self, position):
         """return color of given position"""
         # initially all panels are black -> if not painted yet panel is black
         #  black: 0 ; white: 1
-        painted = list(filter(lambda x: x[0] == position, self.painted))
-        return painted[-1][1] if len(painted) else 0
+        return self.panels.get(position, 0)
 
     def get_nof_painted(self):
         """return number of unique painted panels"""
-        return len(set([x[0] for x in self.painted]))
+        return len(self.panels)
+
+    def render(self) -> np.ndarray:
+        """image of the hull as array, black: 0 ; white: 1, the top left panel is the minimum position"""
+        if not self.panels:
+            return np.zeros((1, 1), dtype=np.uint8)
+        positions = np.array(list(self.panels.keys()))
+        colors = np.fromiter(self.panels.values(), dtype=np.uint8, count=len(self.panels))
+        positions -= positions.min(axis=0)
+        image = np.zeros(positions.max(axis=0)[::-1] + 1, dtype=np.uint8)
+        image[positions[:, 1], positions[:, 0]] = colors
+        return image
 
     def draw(self):
         """draw the current image"""
-        final_color_values = {}
-        area_limits = ((0, 0), (0, 0))  # ((x_min, y_min), (x_max, y_max))
-        for value in reversed(self.painted):
-            if not (value in final_color_values.keys()):
-                final_color_values[value[0]] = value[1]
-                # change area limits if necessary
-                area_limits = (
-                    (
-                        min(area_limits[0][0], value[0][0]),
-                        min(area_limits[0][1], value[0][1]),
-                    ),  # min
-                    (
-                        max(area_limits[1][0], value[0][0]),
-                        max(area_limits[1][1], value[0][1]),
-                    ),  # max
-                )
-        # init nested array of correct size with all values black
-        color_array = [
-            [0] * (area_limits[1][0] - area_limits[0][0] + 1)
-            for _ in range(area_limits[1][1] - area_limits[0][1] + 1)
-        ]
-        # add values to array
-        for tile in final_color_values.keys():
-            color_array[tile[1] - area_limits[0][1]][tile[0] - area_limits[0][0]] = (
-                final_color_values[tile]
-            )
-        # print results
-        for row in color_array:
-            print("".join("#" if value == 1 else " " for value in row))
+        characters = np.where(self.render() == 1, "#", " ")
+        for row in characters:
+            print("".join(row))
 
 
 class Test2019Day11(unittest.TestCase):
-    # Tests not feasible
-    pass
+    def test_painted_panels(self):
+        robot = Robot(puzzle_input, keep_history=True)
+        self.assertEqual(robot.run(), 1930)
+        self.assertEqual(len({position for position, _ in robot.history}), 1930)
+        self.assertGreater(len(robot.history), 1930)
+
+    def test_registration_identifier(self):
+        robot = Robot(puzzle_input, input_painted=[((0, 0), 1)])
+        robot.run()
+        image = robot.render()
+        self.assertTupleEqual(image.shape, (6, 43))
+        self.assertEqual(
+            "".join("#" if value else " " for value in image[0]),
+            " ###  #### #  # #  # ####  ##  #### #  #   ",
+        )
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
 import unittest
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 # position of four moons [Io, Europa, Ganymede, Callisto]
 puzzle_input = "<x=5, y=13, z=-3>\
@@ -83,25 +86,66 @@ def get_potential_energy(pos: tuple):
     return sum(abs(x) for x in pos)
 
 
-def simulate_t_time_steps(init_positions: list, init_velocities=None, time_steps=100):
-    """simulate t time steps given list of tuples of position and velocity"""
-    total_energy = 0
-    if init_velocities is None:
-        init_velocities = [(0,) * len(init_positions[0])] * len(init_positions)
-    positions = init_positions
-    velocities = init_velocities
-    for t in range(time_steps):
-        for i, moon in enumerate(positions):
-            velocities[i] = update_velocity(moon, positions, velocities[i])
-        for i in range(len(positions)):
-            positions[i] = update_positions(positions[i], velocities[i])
-
-    for i in range(len(positions)):
-        total_energy += get_kinetic_energy(velocities[i]) * get_potential_energy(
-            positions[i]
+class MoonSystem:
+    """
+    N bodies in d dimensions, positions and velocities are kept as (N, d) arrays.
+    One time step applies the gravity of all pairs of moons in a single array operation.
+    """
+
+    def __init__(self, positions: list, velocities: Optional[list] = None):
+        positions = np.array(positions, dtype=np.int64).reshape(len(positions), -1)
+        # positions and velocities are views on one state, so it can be compared in a single call
+        self.state = np.zeros((2 * positions.shape[0], positions.shape[1]), dtype=np.int64)
+        self.positions = self.state[: positions.shape[0]]
+        self.velocities = self.state[positions.shape[0] :]
+        self.positions[:] = positions
+        if velocities is not None:
+            self.velocities[:] = np.array(velocities, dtype=np.int64).reshape(positions.shape)
+
+    def step(self, time_steps: int = 1) -> None:
+        """simulate the given number of time steps"""
+        for _ in range(time_steps):
+            # every other moon pulls by exactly one per axis: sign(other - moon) summed over all others
+            self.velocities += np.sign(self.positions[None, :, :] - self.positions[:, None, :]).sum(axis=1)
+            self.positions += self.velocities
+
+    def axis_periods(self) -> List[int]:
+        """
+        Number of time steps until the state of every axis repeats, the axes are independent.
+        Every step can be reversed, so the first repeated state of an axis is its initial one,
+        all axes are checked for it in the same run.
+        """
+        initial_state = self.state.copy()
+        periods = [0] * self.state.shape[1]
+        time_step = 0
+        while not all(periods):
+            self.step()
+            time_step += 1
+            repeated = (self.state == initial_state).all(axis=0)
+            if repeated.any():
+                for axis in np.flatnonzero(repeated):
+                    if not periods[axis]:
+                        periods[axis] = time_step
+        return periods
+
+    def total_energy(self) -> int:
+        """sum over the moons of potential times kinetic energy"""
+        return int((np.abs(self.positions).sum(axis=1) * np.abs(self.velocities).sum(axis=1)).sum())
+
+    def as_tuples(self) -> Tuple[List[tuple], List[tuple]]:
+        """positions and velocities as lists of tuples"""
+        return (
+            [tuple(map(int, p)) for p in self.positions],
+            [tuple(map(int, v)) for v in self.velocities],
         )
 
-    return positions, velocities, total_energy
+
+def simulate_t_time_steps(init_positions: list, init_velocities=None, time_steps=100):
+    """simulate t time steps given list of tuples of position and velocity"""
+    system = MoonSystem(init_positions, init_velocities)
+    system.step(time_steps)
+    positions, velocities = system.as_tuples()
+    return positions, velocities, system.total_energy()
 
 
 def least_common_multiple(list_of_divisors: list):
@@ -114,37 +158,20 @@ def least_common_multiple(list_of_divisors: list):
     return lcm
 
 
+def find_axis_period(positions_d: tuple, velocities_d: tuple) -> int:
+    """
+    Number of time steps until the state of a single axis repeats.
+    Every step can be reversed, so the first repeated state is the initial one,
+    there is no need to remember any of the states in between.
+    """
+    return MoonSystem([[p] for p in positions_d], [[v] for v in velocities_d]).axis_periods()[0]
+
+
 def find_previously_match(init_positions: list, init_velocities=None):
     """Simulate time steps until there is a state that was previously seen"""
     # thanks to SO, dimensions x,y,z are independent! brute force did not work
-    dimension = len(init_positions[0])
-    dim_period = [0] * dimension
-    if init_velocities is None:
-        init_velocities = [(0,) * len(init_positions[0])] * len(init_positions)
-    positions = init_positions
-    velocities = init_velocities
-    for d in range(dimension):
-        seen_states = []
-        positions_d = tuple(p[d] for p in positions)
-        velocities_d = tuple(v[d] for v in velocities)
-        while True:
-            seen_states.append((positions_d + velocities_d))
-            velocities_d = tuple(
-                velocities_d[i]
-                + sum(
-                    1 if other > current else (-1 if other < current else 0)
-                    for other in positions_d
-                )
-                for i, current in enumerate(positions_d)
-            )
-            positions_d = tuple(
-                positions_d[i] + velocities_d[i] for i in range(len(positions_d))
-            )
-            if (positions_d + velocities_d) in seen_states:
-                dim_period[d] = len(seen_states)
-                break
-    # return least common multiple
-    return least_common_multiple(dim_period)
+    # return least common multiple of the periods of the axes
+    return least_common_multiple(MoonSystem(init_positions, init_velocities).axis_periods())
 
 
 class Test2019Day12(unittest.TestCase):
@@ -197,6 +224,18 @@ class Test2019Day12(unittest.TestCase):
                 example_input = convert_list_of_coordinates_to_tuple(string_input)
                 self.assertEqual(find_previously_match(example_input), t)
 
+    def test_moon_system(self):
+        system = MoonSystem([(-1, 0, 2), (2, -10, -7), (4, -8, 8), (3, 5, -1)])
+        system.step(10)
+        self.assertEqual(system.total_energy(), 179)
+        system = MoonSystem([(0,), (3,), (10,)], [(1,), (0,), (-1,)])
+        system.step()
+        self.assertListEqual(system.as_tuples()[1], [(3,), (0,), (-3,)])
+        self.assertListEqual(system.as_tuples()[0], [(3,), (3,), (7,)])
+
+    def test_axis_period(self):
+        self.assertEqual(find_axis_period((-1, 2, 4, 3), (0, 0, 0, 0)), 18)
+
 
 if __name__ == "__main__":
     print(">>> Start Main 12:")
@@ -1,6 +1,14 @@
 import unittest
+from typing import Dict, List, Optional, Tuple
 
-from Day05 import run_intcode_program
+import numpy as np
+
+from intcode import IntcodeMachine, run_intcode_program
+
+# tile ids
+EMPTY, WALL, BLOCK, PADDLE, BALL = 0, 1, 2, 3, 4
+ENTITIES = {EMPTY: " ", WALL: "▓", BLOCK: "█", PADDLE: "═", BALL: "O"}
+SCORE_POSITION = (-1, 0)
 
 puzzle_input = [
     1,
@@ -2587,87 +2595,139 @@ def load_map(program):
     return board
 
 
-def print_map(game_map: dict):
-    """displays the provided map"""
-    # get board size, expect only positive values
-    board_size = list([0, 0])
-    for coord in game_map.keys():
-        board_size[0] = max(coord[0], board_size[0])
-        board_size[1] = max(coord[1], board_size[1])
-    # create nested list of matching size
-    board = [[0] * (board_size[0] + 1) for _ in range(board_size[1] + 1)]
-    for key in game_map.keys():
-        board[key[1]][key[0]] = game_map[key]
-    entities = {0: " ", 1: "▓", 2: "█", 3: "═", 4: "O"}
-    for row in board:
-        print("".join(entities[val] for val in row))
+class ArcadeGame:
+    """
+    Headless arcade cabinet.
+    The number of blocks, the ball and the paddle position are updated incrementally from every output triple,
+    so a frame only costs as much as the tiles it changes.
+    Optionally the board is kept as numpy array for rendering.
+    """
 
+    def __init__(self, program: List[int], keep_board: bool = False):
+        self.machine = IntcodeMachine(program)
+        self.tiles: Dict[Tuple[int, int], int] = {}
+        self.blocks = 0
+        self.score = 0
+        self.ball: Optional[Tuple[int, int]] = None
+        self.paddle: Optional[Tuple[int, int]] = None
+        self.board: Optional[np.ndarray] = np.zeros((0, 0), dtype=np.uint8) if keep_board else None
+        self._pending: List[int] = []
 
-def play_game(program, initial_code_input, selfplay=False):
-    """read joystick inputs to play the game, play as long as there are blocks on the board"""
-    blocks = 1
-    score = 0
-    control = initial_code_input
-    instr_pointer, rb_pointer = 0, 0
-    board = {}
-    while blocks > 0:
-        output, instr_pointer, rb_pointer, program = run_intcode_program(
-            program,
-            control,
-            pointer_start=instr_pointer if instr_pointer else 0,
-            relative_base_start=rb_pointer if rb_pointer else 0,
-        )
-        # read board values
-        for i in range(0, len(output) - 2, 3):
-            board[tuple(output[i : i + 2])] = output[i + 2]
-        # get score and remove field from board
-        score = board.pop((-1, 0), score)
-        blocks = sum(val == 2 for val in board.values())
-        if selfplay:
-            print_map(board)
-            print("Score = %d" % score)
-        if selfplay:
-            # get user control
-            joystick_input = input("What is your move? (left a, nothing s, right d)")
-            control = list(
-                [-1 if joystick_input == "a" else (1 if joystick_input == "d" else 0)]
+    def _update(self, output: List[int]) -> None:
+        """update the state with the output triples (x, y, tile id) or (-1, 0, score)"""
+        output = self._pending + output
+        end = len(output) - len(output) % 3
+        self._pending = output[end:]
+        for i in range(0, end, 3):
+            position, tile = (output[i], output[i + 1]), output[i + 2]
+            if position == SCORE_POSITION:
+                self.score = tile
+                continue
+            previous = self.tiles.get(position, EMPTY)
+            self.tiles[position] = tile
+            self.blocks += (tile == BLOCK) - (previous == BLOCK)
+            if tile == BALL:
+                self.ball = position
+            elif tile == PADDLE:
+                self.paddle = position
+            if self.board is not None:
+                self._set_board(position, tile)
+
+    def _set_board(self, position: Tuple[int, int], tile: int) -> None:
+        """set a tile of the numpy board, growing it if necessary (only positive coordinates)"""
+        x, y = position
+        if y >= self.board.shape[0] or x >= self.board.shape[1]:
+            self.board = np.pad(
+                self.board,
+                ((0, max(0, y + 1 - self.board.shape[0])), (0, max(0, x + 1 - self.board.shape[1]))),
             )
-        else:
-            ball_pos = (0, 0)
-            paddle_pos = (0, 0)
-            for key, val in board.items():
-                if val == 4:
-                    ball_pos = key
-                elif val == 3:
-                    paddle_pos = key
-            control = list(
-                [
-                    (
-                        -1
-                        if ball_pos[0] < paddle_pos[0]
-                        else (1 if ball_pos[0] > paddle_pos[0] else 0)
-                    )
-                ]
+        self.board[y, x] = tile
+
+    def step(self, joystick: Optional[int] = None) -> None:
+        """move the joystick (left -1, nothing 0, right 1) and run until the next input is needed"""
+        if joystick is not None:
+            self.machine.add_input([joystick])
+        self._update(self.machine.run_until_input())
+
+    def auto_joystick(self) -> int:
+        """move the paddle towards the ball"""
+        if self.ball is None or self.paddle is None:
+            return 0
+        return (self.ball[0] > self.paddle[0]) - (self.ball[0] < self.paddle[0])
+
+    def auto_play(self) -> int:
+        """let the paddle follow the ball until all blocks are destroyed or the game is over, returns the score"""
+        self.step()
+        while self.blocks > 0 and not self.machine.halted:
+            self.step(self.auto_joystick())
+        return self.score
+
+    def render(self) -> str:
+        """the current board as string"""
+        board = self.board
+        if board is None:
+            if not self.tiles:
+                return ""
+            board = np.zeros(
+                (max(y for _, y in self.tiles) + 1, max(x for x, _ in self.tiles) + 1), dtype=np.uint8
             )
+            positions = np.array(list(self.tiles.keys()))
+            board[positions[:, 1], positions[:, 0]] = list(self.tiles.values())
+        characters = np.array([ENTITIES[tile] for tile in sorted(ENTITIES)])[board]
+        return "\n".join("".join(row) for row in characters)
 
-    return score
+
+def play_game(program, initial_code_input, selfplay=False):
+    """read joystick inputs to play the game, play as long as there are blocks on the board"""
+    game = ArcadeGame(program, keep_board=selfplay)
+    if not selfplay:
+        game.machine.add_input(initial_code_input)
+        return game.auto_play()
+    game.step(initial_code_input[0] if initial_code_input else None)
+    while game.blocks > 0 and not game.machine.halted:
+        print(game.render())
+        print("Score = %d" % game.score)
+        # get user control
+        joystick_input = input("What is your move? (left a, nothing s, right d)")
+        game.step(-1 if joystick_input == "a" else (1 if joystick_input == "d" else 0))
+    return game.score
 
 
 class Test2019Day13(unittest.TestCase):
-    pass
+    def test_blocks_on_screen(self):
+        game = ArcadeGame(puzzle_input, keep_board=True)
+        game.step()
+        self.assertTrue(game.machine.halted)
+        self.assertEqual(game.blocks, 277)
+        self.assertEqual(game.blocks, int(np.count_nonzero(game.board == BLOCK)))
+        self.assertEqual(game.blocks, sum(val == BLOCK for val in load_map(puzzle_input.copy()).values()))
+
+    def test_auto_play(self):
+        program = puzzle_input.copy()
+        program[0] = 2
+        game = ArcadeGame(program)
+        self.assertEqual(game.auto_play(), 12856)
+        self.assertEqual(game.blocks, 0)
+
+    def test_render(self):
+        game = ArcadeGame([104, 0, 104, 0, 104, 1, 104, 2, 104, 1, 104, 4, 104, -1, 104, 0, 104, 7, 99])
+        game.step()
+        self.assertEqual(game.render(), "▓  \n  O")
+        self.assertEqual(game.ball, (2, 1))
+        self.assertEqual(game.score, 7)
+        for keep_board in [False, True]:
+            with self.subTest(keep_board=keep_board):
+                self.assertEqual(ArcadeGame([99], keep_board=keep_board).render(), "")
 
 
 if __name__ == "__main__":
     print(">>> Start Main 13:")
     print("Part 1):")
-    game_map = load_map(puzzle_input)
-    blocks = 0
-    for item in game_map.values():
-        if item == 2:
-            blocks += 1
-    print("There are {} blocks".format(blocks))
+    arcade = ArcadeGame(puzzle_input)
+    arcade.step()
+    print("There are {} blocks".format(arcade.blocks))
     print("Part 2):")
-    puzzle_input[0] = 2
-    score = play_game(puzzle_input, [])
-    print(score)
+    free_play = puzzle_input.copy()
+    free_play[0] = 2
+    print(play_game(free_play, []))
     print("End Main 13<<<")
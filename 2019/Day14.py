@@ -1,6 +1,5 @@
 import unittest
 import math
-import copy
 
 puzzle_input = [
     "14 LQGXD, 6 TDLQ => 9 VGLV",
@@ -151,45 +150,97 @@ def solve_graph(dep_graph, goal="FUEL", start="ORE"):
     return ore_amount, current_goal_node
 
 
+class Nanofactory:
+    """Reaction graph compiled once: producers indexed by product and sorted topologically"""
+
+    def __init__(self, dep_graph, goal="FUEL", start="ORE"):
+        self.goal = goal
+        self.start = start
+        # product -> (produced quantity, list of (educt, quantity))
+        self.reactions = {}
+        for educts, products in dep_graph:
+            for product, quantity in products.items():
+                if product in self.reactions:
+                    raise Exception(
+                        "The key {} appears in more than one dependency path".format(
+                            product
+                        )
+                    )
+                self.reactions[product] = (quantity, list(educts.items()))
+        if goal not in self.reactions:
+            raise Exception("There is not a single node that can achieve the goal")
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        """Order the products reachable from goal so every product comes before its educts"""
+        consumers = {self.goal: 0}
+        stack = [self.goal]
+        while stack:
+            product = stack.pop()
+            if product == self.start:
+                continue
+            if product not in self.reactions:
+                raise Exception(
+                    "The key {} was not found in the dependency tree".format(product)
+                )
+            for educt, _ in self.reactions[product][1]:
+                if educt not in consumers:
+                    consumers[educt] = 0
+                    stack.append(educt)
+                consumers[educt] += 1
+        order = []
+        ready = [self.goal]
+        while ready:
+            product = ready.pop()
+            if product == self.start:
+                continue
+            order.append(product)
+            for educt, _ in self.reactions[product][1]:
+                consumers[educt] -= 1
+                if consumers[educt] == 0:
+                    ready.append(educt)
+        if len(order) != len(consumers) - (self.start in consumers):
+            raise Exception("The dependency graph contains a cycle")
+        return order
+
+    def start_for_goal(self, goal_amount=1):
+        """Amount of start needed for goal_amount of goal, in one pass over the order"""
+        needed = {self.goal: goal_amount}
+        for product in self.order:
+            amount = needed.pop(product, 0)
+            if amount <= 0:
+                continue
+            quantity, educts = self.reactions[product]
+            # leftovers are implicit: the reaction runs just often enough
+            reaction_multiplicator = -(-amount // quantity)
+            for educt, educt_quantity in educts:
+                needed[educt] = (
+                    needed.get(educt, 0) + reaction_multiplicator * educt_quantity
+                )
+        return needed.get(self.start, 0)
+
+    def max_goal_for_start(self, start_amount):
+        """Largest goal amount producible from start_amount, galloping then bisecting"""
+        per_goal = self.start_for_goal(1)
+        if per_goal > start_amount:
+            return 0
+        # leftovers only help, so start_amount // per_goal is always reachable
+        low = start_amount // per_goal
+        high = low * 2
+        while self.start_for_goal(high) <= start_amount:
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.start_for_goal(middle) <= start_amount:
+                low = middle
+            else:
+                high = middle
+        return low
+
+
 def max_fuel_for_ore(init_graph, ore_amount=1000000000000, goal="FUEL", start="ORE"):
     """Get as many fuel with provided amount of ore"""
-    graph = copy.deepcopy(init_graph)
-    goal_amount = 0
-    start_amount = 0
-    ore_to_fuel_amount, _ = solve_graph(copy.deepcopy(graph), goal, start)
-    # find goal node
-    goal_nodes = find_product_in_graph(graph.copy(), goal)
-    if len(goal_nodes) > 1:
-        raise Exception("There is more than one way to achieve the goal")
-    else:
-        goal_node = goal_nodes[0]
-        del goal_nodes
-    graph.remove(goal_node)
-    new_goal_node = ({}, {})
-    # as long as there is not to much of start
-    while start_amount <= ore_amount:
-        # it should be safe to add multiple fuels at once, as long as there is
-        # enough time to get rid of the overproduction
-        multiplicator = int(0.5 * ((ore_amount - start_amount) / ore_to_fuel_amount))
-        multiplicator = multiplicator if multiplicator >= 10 else 1
-        # append original goal with multiplicator into new goal node
-        for side_i in range(len(goal_node)):
-            for key, value in goal_node[side_i].items():
-                if key in new_goal_node[side_i]:
-                    new_goal_node[side_i][key] += value * multiplicator
-                else:
-                    new_goal_node[side_i][key] = value * multiplicator
-        new_graph = graph.copy() + list([new_goal_node])
-        amount, new_goal_node = solve_graph(copy.deepcopy(new_graph), goal, start)
-        # goal and start will be readded in the next iteration, so they can be removed.
-        # currently just keep all the overproduction
-        if start in new_goal_node[0]:
-            new_goal_node[0].pop(start)
-        if goal in new_goal_node[1]:
-            new_goal_node[1].pop(goal)
-        start_amount += amount
-        goal_amount += multiplicator
-    return goal_amount - 1
+    return Nanofactory(init_graph, goal, start).max_goal_for_start(ore_amount)
 
 
 class Test2019Day14(unittest.TestCase):
@@ -362,6 +413,18 @@ class Test2019Day14(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(fuel, max_fuel_for_ore(parse_dep_graph(dependencies)))
 
+    def test_nanofactory(self):
+        factory = Nanofactory(parse_dep_graph(puzzle_input))
+        self.assertEqual(factory.order[0], "FUEL")
+        self.assertNotIn("ORE", factory.order)
+        self.assertEqual(
+            solve_graph(parse_dep_graph(puzzle_input))[0], factory.start_for_goal(1)
+        )
+        self.assertEqual(10, factory.max_goal_for_start(factory.start_for_goal(10)))
+        self.assertEqual(0, factory.max_goal_for_start(factory.start_for_goal(1) - 1))
+        with self.assertRaises(Exception):
+            Nanofactory(parse_dep_graph(["1 B => 1 A", "1 A => 1 B", "1 A => 1 FUEL"]))
+
 
 if __name__ == "__main__":
     print(">>> Start Main 14:")
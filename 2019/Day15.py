@@ -1,8 +1,9 @@
 import unittest
+from collections import deque
 from typing import Dict, List, Tuple, Set
 
-from helper.file import read_lines_as_list
-from Day05 import run_intcode_program
+from helper.file import load_file_and_split
+from intcode import IntcodeMachine, PagedMemory
 
 
 # Directions
@@ -10,35 +11,55 @@ from Day05 import run_intcode_program
 dirs = {1: (0, 1), 2: (0, -1), 3: (-1, 0), 4: (1, 0)}
 
 
-def find_shortest_path(
-    program: List[int], valid_programs: List[List[int]]
-) -> (int, List[int]):
-    """find the length of the shortest path by generating all paths with length n"""
-    new_valid_programs = []
-    for valid in valid_programs:
-        for curr_dir in dirs.keys():
-            new_input = valid + [curr_dir]
-            outp, _, _, _ = run_intcode_program(program, new_input)
+def find_shortest_path(program: List[int]) -> (int, List[int]):
+    """
+    find the length of the shortest path to the oxygen system using a breadth first search.
+    Every expansion forks the droid at the frontier and moves it a single step,
+    instead of replaying the whole path from the start of the program.
+    """
+    start = (0, 0)
+    visited: Set[Tuple[int, int]] = {start}
+    # every step forks, the paged memory shares the unchanged pages
+    frontier = deque([(start, [], IntcodeMachine(program, memory=PagedMemory))])
+    while frontier:
+        position, path, droid = frontier.popleft()
+        for curr_dir, step in dirs.items():
+            new_position = (position[0] + step[0], position[1] + step[1])
+            if new_position in visited:
+                continue
+            visited.add(new_position)
+            new_droid = droid.fork()
+            new_droid.add_input([curr_dir])
             # Status (output[0])
             # 0: The repair droid hit a wall. Its position has not changed.
             # 1: The repair droid has moved one step in the requested direction.
             # 2: The repair droid has moved one step in the requested direction; new pos == oxygen system pos.
-            if outp:  # 1 or 2
-                # add new found program to possible descendants
-                new_valid_programs.append(new_input)
-                if outp == 2:
-                    return len(new_input), new_input
-    return find_shortest_path(program, new_valid_programs)
+            status = new_droid.run_until_output()[0]
+            if status == 0:
+                continue
+            new_path = path + [curr_dir]
+            if status == 2:
+                return len(new_path), new_path
+            frontier.append((new_position, new_path, new_droid))
+    raise ValueError("The oxygen system can not be reached.")
 
 
 class Test2019Day15(unittest.TestCase):
-    pass
+    def test_shortest_path(self):
+        program = load_file_and_split("data/15.txt", sep=",", inst=int)
+        length, path = find_shortest_path(program)
+        self.assertEqual(length, 240)
+        self.assertEqual(length, len(path))
+        # replaying the path from the start has to end at the oxygen system
+        droid = IntcodeMachine(program)
+        droid.add_input(path)
+        self.assertEqual(droid.run_until_output(length)[-1], 2)
 
 
 if __name__ == "__main__":
     print(">>> Start Main 15:")
-    program = read_lines_as_list("data/15.txt")
-    i, path = find_shortest_path(program, [[]])
+    program = load_file_and_split("data/15.txt", sep=",", inst=int)
+    i, path = find_shortest_path(program)
     print("Part 1):")
     print(i)
     print("Part 2):")
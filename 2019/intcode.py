@@ -0,0 +1,846 @@
+############################################################################################
+# INTCODE COMPUTER                                                                         #
+# Shared engine for all days using the intcode computer (5, 7, 9, 11, 13, 15)              #
+# Every raw instruction value is decoded once into its opcode and parameter modes,         #
+# the opcodes are then dispatched through a jump table instead of an if/elif chain.        #
+############################################################################################
+
+import struct
+from array import array
+from collections import Counter, deque
+from copy import copy
+from time import perf_counter
+from typing import (
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+# parameter modes:
+# 0: position mode - parameter is position of value
+# 1: immediate mode - parameter is value
+# 2: relative basis - value at (basis + next value)
+POSITION, IMMEDIATE, RELATIVE = 0, 1, 2
+
+# number of parameters per opcode
+PARAMETER_COUNT: Dict[int, int] = {1: 3, 2: 3, 3: 1, 4: 1, 5: 2, 6: 2, 7: 3, 8: 3, 9: 1, 99: 0}
+
+# cache of already decoded instructions, keyed by the raw instruction value
+DECODED: Dict[int, Tuple[int, Tuple[int, int, int]]] = {}
+
+
+def decode_instruction(instruction: int) -> Tuple[int, Tuple[int, int, int]]:
+    """
+    Split an instruction into its opcode and the modes of the (up to three) parameters.
+    The result is cached, so every distinct instruction value gets decoded only once.
+    :param instruction: raw instruction value, e.g. 1002
+    :return: opcode and the parameter modes in parameter order, e.g. (2, (0, 1, 0))
+    """
+    try:
+        return DECODED[instruction]
+    except KeyError:
+        pass
+    op = instruction % 100
+    if op not in PARAMETER_COUNT:
+        raise ValueError("Something went wrong, opcode {} is not expected.".format(op))
+    modes = (instruction // 100 % 10, instruction // 1000 % 10, instruction // 10000 % 10)
+    if any(mode not in (POSITION, IMMEDIATE, RELATIVE) for mode in modes):
+        raise ValueError("invalid parameter mode in instruction {}".format(instruction))
+    DECODED[instruction] = op, modes
+    return op, modes
+
+
+# addresses per page of the PagedMemory, 2 ** PAGE_BITS
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+
+class ListMemory:
+    """
+    Dense memory working in place on a list, grows up to the highest written address.
+    Reads past the end are zero without growing the list.
+    """
+
+    def __init__(self, intcode: List[int]):
+        self.values = intcode
+
+    def read(self, address: int) -> int:
+        """read the value at address"""
+        if address < 0:
+            raise ValueError("Can not access negative address {}".format(address))
+        return self.values[address] if address < len(self.values) else 0
+
+    def write(self, address: int, value: int) -> None:
+        """write value to address"""
+        if address < 0:
+            raise ValueError("Can not access negative address {}".format(address))
+        if address >= len(self.values):
+            self.values.extend([0] * (address + 1 - len(self.values)))
+        self.values[address] = value
+
+    def copy(self) -> "ListMemory":
+        """independent copy of the memory"""
+        return ListMemory(self.values.copy())
+
+
+class PagedMemory:
+    """
+    The program image is kept as dense array('q'),
+    addresses past the image are stored in zero-initialized pages that are only created on write.
+    Memory stays proportional to the touched addresses and every read is O(1).
+    Values have to fit into a signed 64-bit integer.
+    Copies are copy-on-write, the image is copied on the first write to it (a single memcpy),
+    the other pages are copied one by one when they get written.
+    """
+
+    def __init__(self, intcode: List[int]):
+        self.image = array("q", intcode)
+        self.pages: Dict[int, array] = {}
+        # parts of the memory still shared with copies
+        self._shared_image = False
+        self._shared_pages: Set[int] = set()
+
+    def read(self, address: int) -> int:
+        """read the value at address"""
+        if 0 <= address < len(self.image):
+            return self.image[address]
+        if address < 0:
+            raise ValueError("Can not access negative address {}".format(address))
+        page = self.pages.get(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def write(self, address: int, value: int) -> None:
+        """write value to address"""
+        if 0 <= address < len(self.image):
+            if self._shared_image:
+                self.image = self.image[:]
+                self._shared_image = False
+            self.image[address] = value
+            return
+        if address < 0:
+            raise ValueError("Can not access negative address {}".format(address))
+        page_nr = address >> PAGE_BITS
+        page = self.pages.get(page_nr)
+        if page is None:
+            page = self.pages[page_nr] = array("q", bytes(8 * PAGE_SIZE))
+        elif page_nr in self._shared_pages:
+            page = self.pages[page_nr] = page[:]
+            self._shared_pages.discard(page_nr)
+        page[address & PAGE_MASK] = value
+
+    def own_image(self) -> array:
+        """the image for direct access, it gets copied first if it is still shared with a copy"""
+        if self._shared_image:
+            self.image = self.image[:]
+            self._shared_image = False
+        return self.image
+
+    def copy(self) -> "PagedMemory":
+        """copy-on-write copy of the memory, both memories share their values until they get written"""
+        other = PagedMemory([])
+        other.image = self.image
+        other.pages = self.pages.copy()
+        self._shared_image = other._shared_image = True
+        self._shared_pages = set(self.pages)
+        other._shared_pages = set(self.pages)
+        return other
+
+
+Memory = Union[ListMemory, PagedMemory]
+
+# entry of a binary trace: instruction pointer and raw instruction
+TRACE_ENTRY = struct.Struct("<qq")
+
+
+class IntcodeProfiler:
+    """
+    Opt-in instrumentation of the intcode interpreter, attach it with machine.profiler = IntcodeProfiler().
+    Counts the executed opcodes and the hits per address,
+    optionally the taken jumps (source, target) and a binary trace of every executed instruction.
+    Machines without profiler do not pay for it.
+    """
+
+    def __init__(self, jumps: bool = False, trace_path: Optional[str] = None, buffer_size: int = 1 << 16):
+        self.opcodes: Counter = Counter()
+        self.addresses: Counter = Counter()
+        self.jumps: Optional[Counter] = Counter() if jumps else None
+        self._trace: Optional[BinaryIO] = open(trace_path, "wb") if trace_path else None  # pylint: disable=R1732
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+
+    def __enter__(self) -> "IntcodeProfiler":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def record(self, pointer: int, instruction: int, op: int) -> None:
+        """record a single executed instruction"""
+        self.opcodes[op] += 1
+        self.addresses[pointer] += 1
+        if self._trace is not None:
+            self._buffer += TRACE_ENTRY.pack(pointer, instruction)
+            if len(self._buffer) >= self._buffer_size:
+                self.flush()
+
+    def record_jump(self, source: int, target: int) -> None:
+        """record a taken jump"""
+        if self.jumps is not None:
+            self.jumps[source, target] += 1
+
+    def flush(self) -> None:
+        """write the buffered trace to the file"""
+        if self._trace is not None:
+            self._trace.write(self._buffer)
+            self._buffer.clear()
+
+    def close(self) -> None:
+        """flush and close the trace file"""
+        if self._trace is not None:
+            self.flush()
+            self._trace.close()
+            self._trace = None
+
+    def steps(self) -> int:
+        """total number of executed instructions"""
+        return sum(self.opcodes.values())
+
+    def hottest(self, n: int = 10) -> List[Tuple[int, int]]:
+        """the n most executed addresses and their number of hits"""
+        return self.addresses.most_common(n)
+
+
+def read_trace(trace_path: str) -> Iterator[Tuple[int, int]]:
+    """read a binary trace written by the IntcodeProfiler, yields (pointer, instruction)"""
+    with open(trace_path, "rb") as file:
+        yield from TRACE_ENTRY.iter_unpack(file.read())
+
+
+class IntcodeMachine:
+    """
+    Resumable intcode computer keeping its memory, instruction pointer and relative base in place.
+    Inputs are queued in a deque, the machine pauses whenever it needs more input,
+    so interactive programs can be continued without copying the memory.
+    The memory backend can be chosen, by default the faster ListMemory is used.
+    PagedMemory shares its pages copy-on-write, which pays off for callers that fork a lot.
+    The program is copied, unless in_place is set.
+    """
+
+    def __init__(
+        self,
+        intcode: List[int],
+        pointer: int = 0,
+        relative_base: int = 0,
+        memory: Type[Memory] = ListMemory,
+        in_place: bool = False,
+    ):
+        self.memory: Memory = memory(intcode if in_place else list(intcode))
+        self._read = self.memory.read
+        self._write = self.memory.write
+        self.pointer = pointer
+        self.relative_base = relative_base
+        self.input: Deque[int] = deque()
+        self.output: List[int] = []
+        self.halted = False
+        self.show_output = False
+        self.profiler: Optional[IntcodeProfiler] = None
+        # stop running as soon as the output has this length
+        self._output_limit: Union[int, float] = float("inf")
+
+    def _address(self, offset: int, mode: int) -> int:
+        """get the address the parameter at pointer + offset is referencing"""
+        if mode == IMMEDIATE:
+            return self.pointer + offset
+        if mode == POSITION:
+            return self._read(self.pointer + offset)
+        return self.relative_base + self._read(self.pointer + offset)
+
+    def _get(self, offset: int, mode: int) -> int:
+        """get the value of the parameter at pointer + offset"""
+        return self._read(self._address(offset, mode))
+
+    def _set(self, offset: int, mode: int, value: int) -> None:
+        """set the value of the parameter at pointer + offset"""
+        if mode == IMMEDIATE:
+            raise ValueError("Parameters that are written to can not be in immediate mode")
+        self._write(self._address(offset, mode), value)
+
+    # operations, each returns whether the machine can continue running
+
+    def _add(self, modes: Tuple[int, int, int]) -> bool:
+        self._set(3, modes[2], self._get(1, modes[0]) + self._get(2, modes[1]))
+        self.pointer += 4
+        return True
+
+    def _multiply(self, modes: Tuple[int, int, int]) -> bool:
+        self._set(3, modes[2], self._get(1, modes[0]) * self._get(2, modes[1]))
+        self.pointer += 4
+        return True
+
+    def _input(self, modes: Tuple[int, int, int]) -> bool:
+        if not self.input:
+            return False
+        self._set(1, modes[0], self.input.popleft())
+        self.pointer += 2
+        return True
+
+    def _output(self, modes: Tuple[int, int, int]) -> bool:
+        out = self._get(1, modes[0])
+        if self.show_output:
+            print("Output is: {}".format(out))
+        self.output.append(out)
+        self.pointer += 2
+        return len(self.output) < self._output_limit
+
+    def _jump_if_true(self, modes: Tuple[int, int, int]) -> bool:
+        if self._get(1, modes[0]) != 0:
+            self.pointer = self._get(2, modes[1])
+        else:
+            self.pointer += 3
+        return True
+
+    def _jump_if_false(self, modes: Tuple[int, int, int]) -> bool:
+        if self._get(1, modes[0]) == 0:
+            self.pointer = self._get(2, modes[1])
+        else:
+            self.pointer += 3
+        return True
+
+    def _less_than(self, modes: Tuple[int, int, int]) -> bool:
+        self._set(3, modes[2], 1 if self._get(1, modes[0]) < self._get(2, modes[1]) else 0)
+        self.pointer += 4
+        return True
+
+    def _equals(self, modes: Tuple[int, int, int]) -> bool:
+        self._set(3, modes[2], 1 if self._get(1, modes[0]) == self._get(2, modes[1]) else 0)
+        self.pointer += 4
+        return True
+
+    def _adjust_relative_base(self, modes: Tuple[int, int, int]) -> bool:
+        self.relative_base += self._get(1, modes[0])
+        self.pointer += 2
+        return True
+
+    def _halt(self, _modes: Tuple[int, int, int]) -> bool:
+        self.halted = True
+        return False
+
+    OPERATIONS: Dict[int, Callable[["IntcodeMachine", Tuple[int, int, int]], bool]] = {
+        1: _add,
+        2: _multiply,
+        3: _input,
+        4: _output,
+        5: _jump_if_true,
+        6: _jump_if_false,
+        7: _less_than,
+        8: _equals,
+        9: _adjust_relative_base,
+        99: _halt,
+    }
+
+    def run(self) -> bool:
+        """
+        Run the program until it halts or needs more input.
+        :return: whether the program has halted
+        """
+        if self.profiler is not None:
+            return self._run_profiled()
+        operations = self.OPERATIONS
+        while not self.halted:
+            op, modes = decode_instruction(self._read(self.pointer))
+            if not operations[op](self, modes):
+                break
+        return self.halted
+
+    def _run_profiled(self) -> bool:
+        """run, recording every executed instruction in the profiler"""
+        operations = self.OPERATIONS
+        profiler = self.profiler
+        while not self.halted:
+            pointer = self.pointer
+            instruction = self._read(pointer)
+            op, modes = decode_instruction(instruction)
+            running = operations[op](self, modes)
+            # an input instruction waiting for input was not executed
+            if running or self.halted or self.pointer != pointer:
+                profiler.record(pointer, instruction, op)
+            if op in (5, 6) and self.pointer != pointer + 3:
+                profiler.record_jump(pointer, self.pointer)
+            if not running:
+                break
+        return self.halted
+
+    def fork(self) -> "IntcodeMachine":
+        """
+        Snapshot of the current state as a new machine that can be run independently.
+        Pointer, relative base, input and output are copied, the memory is shared copy-on-write if possible.
+        The fork is not profiled, a new profiler can be attached to it.
+        """
+        machine = copy(self)
+        machine.profiler = None
+        machine.memory = self.memory.copy()
+        machine._read = machine.memory.read
+        machine._write = machine.memory.write
+        machine.input = deque(self.input)
+        machine.output = self.output.copy()
+        return machine
+
+    def add_input(self, values: Iterable[int]) -> None:
+        """append values to the input queue"""
+        self.input.extend(values)
+
+    def take_output(self) -> List[int]:
+        """return all outputs that were not taken yet and clear them"""
+        output, self.output = self.output, []
+        return output
+
+    def run_until_input(self) -> List[int]:
+        """
+        Run until the program halts or needs more input.
+        :return: the outputs produced since the last taken output
+        """
+        self.run()
+        return self.take_output()
+
+    def run_until_output(self, n: int = 1) -> List[int]:
+        """
+        Run until n outputs were produced, the program halts or needs more input.
+        :param n: number of outputs to wait for
+        :return: the produced outputs, fewer than n if the program halted or needs input
+        """
+        output = self.take_output()
+        self._output_limit = n
+        try:
+            self.run()
+        finally:
+            self._output_limit = float("inf")
+        return output + self.take_output()
+
+
+# status of a compiled block
+RUNNING, WAITING, HALTED, STOPPED = 0, 1, 2, 3
+
+# compiled blocks, keyed by their source code, shared between all machines
+COMPILED_BLOCKS: Dict[str, Callable] = {}
+
+
+class JitIntcodeMachine(IntcodeMachine):
+    """
+    Intcode machine compiling the program into Python functions, one per basic block.
+    A block starts wherever the instruction pointer enters the code and ends at the next jump or halt.
+    The parameter modes are resolved ahead of time, so a block is plain Python arithmetic on the memory.
+    Writes into the code of a compiled block invalidate it,
+    the modified cells are run by the interpreter from then on.
+    Always uses the PagedMemory, because the blocks access the program image directly.
+    """
+
+    def __init__(self, intcode: List[int], pointer: int = 0, relative_base: int = 0):
+        super().__init__(intcode, pointer, relative_base, memory=PagedMemory)
+        self._write = self._checked_write
+        # compiled block and end address by start address
+        self._blocks: Dict[int, Callable] = {}
+        self._block_ends: Dict[int, int] = {}
+        # number of compiled blocks containing the cell
+        self._code = [0] * len(self.memory.image)
+        # cells modified after they were compiled, only run by the interpreter
+        self._dirty = bytearray(len(self.memory.image))
+
+    def _checked_write(self, address: int, value: int) -> None:
+        """write of the interpreter, invalidating compiled blocks if necessary"""
+        self.memory.write(address, value)
+        if 0 <= address < len(self._code) and self._code[address]:
+            self._invalidate(address)
+
+    def _invalidate(self, address: int) -> None:
+        """remove every block containing the address and mark the address as modified"""
+        self._dirty[address] = 1
+        for start, end in list(self._block_ends.items()):
+            if start <= address < end:
+                del self._blocks[start]
+                del self._block_ends[start]
+                for i in range(start, end):
+                    self._code[i] -= 1
+
+    def _compile(self, start: int) -> Optional[Callable]:
+        """
+        Compile the basic block starting at start.
+        :return: the compiled block, None if the instruction at start has to be interpreted
+        """
+        image = self.memory.image
+        n = len(image)
+        lines = []
+
+        def get(mode: int, value: int) -> str:
+            if mode == IMMEDIATE:
+                return str(value)
+            if mode == POSITION:
+                return "img[{0}]".format(value) if 0 <= value < n else "read({0})".format(value)
+            return "(img[_a] if 0 <= (_a := rb + {0}) < {1} else read(_a))".format(value, n)
+
+        def put(mode: int, value: int, next_pointer: int) -> None:
+            if mode == POSITION and 0 <= value < n:
+                lines.append("img[{0}] = v".format(value))
+                lines.append("if code[{0}]:".format(value))
+                lines.append("    invalidate({0})".format(value))
+                lines.append("    return {0}, rb, 0".format(next_pointer))
+            elif mode == POSITION:
+                lines.append("write({0}, v)".format(value))
+            else:
+                lines.append("_a = rb + {0}".format(value))
+                lines.append("if 0 <= _a < {0}:".format(n))
+                lines.append("    img[_a] = v")
+                lines.append("    if code[_a]:")
+                lines.append("        invalidate(_a)")
+                lines.append("        return {0}, rb, 0".format(next_pointer))
+                lines.append("else:")
+                lines.append("    write(_a, v)")
+
+        pointer = start
+        op = None
+        while pointer < n and op not in (5, 6, 99):
+            try:
+                op, modes = decode_instruction(image[pointer])
+            except ValueError:
+                break
+            next_pointer = pointer + PARAMETER_COUNT[op] + 1
+            if next_pointer > n or any(self._dirty[pointer:next_pointer]):
+                break
+            if (op in (1, 2, 7, 8) and modes[2] == IMMEDIATE) or (op == 3 and modes[0] == IMMEDIATE):
+                # invalid write, let the interpreter raise the error
+                break
+            params = image[pointer + 1 : next_pointer]
+            if op in (1, 2, 7, 8):
+                a, b = get(modes[0], params[0]), get(modes[1], params[1])
+                expression = {1: "{} + {}", 2: "{} * {}", 7: "1 if {} < {} else 0", 8: "1 if {} == {} else 0"}[op]
+                lines.append("v = " + expression.format(a, b))
+                put(modes[2], params[2], next_pointer)
+            elif op == 3:
+                lines.append("if not inp:")
+                lines.append("    return {0}, rb, {1}".format(pointer, WAITING))
+                lines.append("v = inp.popleft()")
+                put(modes[0], params[0], next_pointer)
+            elif op == 4:
+                lines.append("out.append({0})".format(get(modes[0], params[0])))
+                lines.append("if len(out) >= limit:")
+                lines.append("    return {0}, rb, {1}".format(next_pointer, STOPPED))
+            elif op in (5, 6):
+                condition = "!=" if op == 5 else "=="
+                a, b = get(modes[0], params[0]), get(modes[1], params[1])
+                lines.append("if {0} {1} 0:".format(a, condition))
+                lines.append("    return {0}, rb, 0".format(b))
+                lines.append("return {0}, rb, 0".format(next_pointer))
+            elif op == 9:
+                lines.append("rb += {0}".format(get(modes[0], params[0])))
+            else:
+                lines.append("return {0}, rb, {1}".format(pointer, HALTED))
+            pointer = next_pointer
+        if pointer == start:
+            return None
+        if op not in (5, 6, 99):
+            lines.append("return {0}, rb, 0".format(pointer))
+
+        source = "def block(img, code, read, write, invalidate, inp, out, limit, rb):\n    "
+        source += "\n    ".join(lines)
+        if source not in COMPILED_BLOCKS:
+            namespace = {}
+            exec(compile(source, "<intcode block {}>".format(start), "exec"), namespace)  # pylint: disable=exec-used
+            COMPILED_BLOCKS[source] = namespace["block"]
+        self._blocks[start] = COMPILED_BLOCKS[source]
+        self._block_ends[start] = pointer
+        for i in range(start, pointer):
+            self._code[i] += 1
+        return self._blocks[start]
+
+    def run(self) -> bool:
+        """
+        Run the compiled program until it halts or needs more input.
+        :return: whether the program has halted
+        """
+        if self.show_output or self.profiler is not None:
+            return super().run()
+        image = self.memory.own_image()
+        code, read, write, invalidate = self._code, self._read, self.memory.write, self._invalidate
+        inp, out, limit = self.input, self.output, self._output_limit
+        blocks = self._blocks
+        status = HALTED if self.halted else RUNNING
+        while status == RUNNING:
+            block = blocks.get(self.pointer) or self._compile(self.pointer)
+            if block is None:
+                # interpret a single instruction
+                op, modes = decode_instruction(read(self.pointer))
+                if not self.OPERATIONS[op](self, modes):
+                    status = HALTED if self.halted else WAITING
+                continue
+            self.pointer, self.relative_base, status = block(
+                image, code, read, write, invalidate, inp, out, limit, self.relative_base
+            )
+        self.halted = status == HALTED
+        return self.halted
+
+    def fork(self) -> "JitIntcodeMachine":
+        machine = super().fork()
+        machine._write = machine._checked_write
+        machine._blocks = self._blocks.copy()
+        machine._block_ends = self._block_ends.copy()
+        machine._code = self._code.copy()
+        machine._dirty = self._dirty[:]
+        return machine
+
+
+class Channel:
+    """
+    Bounded FIFO queue connecting the output of one machine with the input of another.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.queue: Deque[int] = deque()
+        self.capacity = capacity
+        self.transferred = 0
+        self.last: Optional[int] = None
+
+    def free(self) -> Union[int, float]:
+        """number of values that can still be put into the channel"""
+        return float("inf") if self.capacity is None else self.capacity - len(self.queue)
+
+    def put(self, value: int) -> None:
+        """send a value through the channel"""
+        self.queue.append(value)
+        self.transferred += 1
+        self.last = value
+
+
+class MachineStats:
+    """
+    Throughput statistics of a single machine in an IntcodeNetwork.
+    """
+
+    def __init__(self):
+        self.inputs = 0  # values received through the channels
+        self.outputs = 0  # values produced
+        self.runs = 0  # number of times the machine made progress
+        self.blocked = 0  # number of times the machine was waiting on input or a full channel
+        self.seconds = 0.0  # time spent running the machine
+
+    def throughput(self) -> float:
+        """outputs per second"""
+        return self.outputs / self.seconds if self.seconds else 0.0
+
+
+class IntcodeNetwork:
+    """
+    Multiple intcode machines connected through bounded channels in any topology.
+    Every machine runs as a generator that only yields when it is waiting on input or a full channel,
+    the scheduler switches between the generators round-robin until all machines have halted.
+    Outputs of machines without outgoing channels are collected in self.output.
+    """
+
+    def __init__(self):
+        self.machines: Dict[Hashable, IntcodeMachine] = {}
+        self.inbound: Dict[Hashable, List[Channel]] = {}
+        self.outbound: Dict[Hashable, List[Channel]] = {}
+        self.output: Dict[Hashable, List[int]] = {}
+        self.stats: Dict[Hashable, MachineStats] = {}
+
+    def add_machine(self, name: Hashable, program: List[int], initial_input: Iterable[int] = ()) -> IntcodeMachine:
+        """create a new machine running the program"""
+        if name in self.machines:
+            raise ValueError("Machine {} does already exist".format(name))
+        machine = IntcodeMachine(program)
+        machine.add_input(initial_input)
+        self.machines[name] = machine
+        self.inbound[name] = []
+        self.outbound[name] = []
+        self.output[name] = []
+        self.stats[name] = MachineStats()
+        return machine
+
+    def connect(self, source: Hashable, target: Hashable, capacity: Optional[int] = None) -> Channel:
+        """send every output of source to the input of target"""
+        channel = Channel(capacity)
+        self.outbound[source].append(channel)
+        self.inbound[target].append(channel)
+        return channel
+
+    @classmethod
+    def chain(
+        cls,
+        programs: List[List[int]],
+        initial_inputs: Optional[List[Iterable[int]]] = None,
+        capacity: Optional[int] = None,
+    ) -> "IntcodeNetwork":
+        """machines 0, ..., n-1 where every machine sends its outputs to the next one"""
+        network = cls()
+        for i, program in enumerate(programs):
+            network.add_machine(i, program, initial_inputs[i] if initial_inputs else ())
+        for i in range(len(programs) - 1):
+            network.connect(i, i + 1, capacity)
+        return network
+
+    @classmethod
+    def ring(
+        cls,
+        programs: List[List[int]],
+        initial_inputs: Optional[List[Iterable[int]]] = None,
+        capacity: Optional[int] = None,
+    ) -> "IntcodeNetwork":
+        """chain where the last machine sends its outputs back to the first one"""
+        network = cls.chain(programs, initial_inputs, capacity)
+        network.connect(len(programs) - 1, 0, capacity)
+        return network
+
+    @classmethod
+    def star(
+        cls,
+        hub_program: List[int],
+        leaf_programs: List[List[int]],
+        initial_inputs: Optional[List[Iterable[int]]] = None,
+        capacity: Optional[int] = None,
+    ) -> "IntcodeNetwork":
+        """
+        The hub sends its outputs to every leaf 0, ..., n-1, the leaves send theirs to the hub.
+        The initial inputs are given for the hub first, then for every leaf.
+        """
+        network = cls()
+        network.add_machine("hub", hub_program, initial_inputs[0] if initial_inputs else ())
+        for i, program in enumerate(leaf_programs):
+            network.add_machine(i, program, initial_inputs[i + 1] if initial_inputs else ())
+            network.connect("hub", i, capacity)
+            network.connect(i, "hub", capacity)
+        return network
+
+    def _process(self, name: Hashable) -> Generator[bool, None, None]:
+        """run a single machine, yields whether the machine made progress since the last yield"""
+        machine = self.machines[name]
+        inbound, outbound = self.inbound[name], self.outbound[name]
+        stats = self.stats[name]
+        while not machine.halted:
+            # only receive new values if the current ones are used up, keeps the channels bounded
+            if not machine.input:
+                for channel in inbound:
+                    stats.inputs += len(channel.queue)
+                    machine.add_input(channel.queue)
+                    channel.queue.clear()
+            room = min((channel.free() for channel in outbound), default=float("inf"))
+            if room <= 0:
+                stats.blocked += 1
+                yield False
+                continue
+            pointer = machine.pointer
+            start = perf_counter()
+            output = machine.run_until_input() if room == float("inf") else machine.run_until_output(room)
+            stats.seconds += perf_counter() - start
+            stats.outputs += len(output)
+            for channel in outbound:
+                for value in output:
+                    channel.put(value)
+            if not outbound:
+                self.output[name] += output
+            if output or pointer != machine.pointer or machine.halted:
+                stats.runs += 1
+                yield True
+            else:
+                stats.blocked += 1
+                yield False
+
+    def run(self) -> None:
+        """
+        Run all machines until every machine has halted.
+        :raises RuntimeError: if the remaining machines are all blocked
+        """
+        processes = {name: self._process(name) for name in self.machines}
+        while processes:
+            progress = False
+            for name, process in list(processes.items()):
+                try:
+                    progress |= next(process)
+                except StopIteration:
+                    del processes[name]
+                    progress = True
+            if processes and not progress:
+                raise RuntimeError("Deadlock, the machines {} are all blocked".format(list(processes)))
+
+
+def run_intcode_program(
+    intcode: list,
+    program_input: list,
+    show_output: bool = False,
+    pointer_start: int = 0,
+    relative_base_start: int = 0,
+) -> (list, int, int, list):
+    """
+    Drop-in replacement of Day05.run_intcode_program using the pre-decoded IntcodeMachine.
+    :param intcode: program, is modified in place
+    :param program_input: values to read, consumed values get removed
+    :param show_output: print every output
+    :param pointer_start: instruction pointer to resume at
+    :param relative_base_start: relative base to resume with
+    :return:
+     - list: all the outputs as a list
+     - int:  current instruction pointer or None
+     - int:  current relative base or None
+     - list: current intcode (the modified input list, not a copy) or None
+    """
+    machine = IntcodeMachine(intcode, pointer_start, relative_base_start, in_place=True)
+    machine.add_input(program_input)
+    machine.show_output = show_output
+    halted = machine.run()
+    del program_input[: len(program_input) - len(machine.input)]
+    if halted:
+        return machine.output, None, None, None
+    return machine.output, machine.pointer, machine.relative_base, intcode
+
+
+if __name__ == "__main__":
+    from timeit import timeit
+
+    import Day05
+    from Day09 import puzzle_input
+
+    def run_with_memory(memory: Type[Memory]) -> Callable[[List[int], List[int]], List[int]]:
+        """runner for the IntcodeMachine using the given memory backend"""
+
+        def runner(intcode: List[int], program_input: List[int]) -> List[int]:
+            machine = IntcodeMachine(intcode, memory=memory)
+            machine.add_input(program_input)
+            return machine.run_until_input()
+
+        return runner
+
+    def run_compiled(intcode: List[int], program_input: List[int]) -> List[int]:
+        """runner for the JitIntcodeMachine"""
+        machine = JitIntcodeMachine(intcode)
+        machine.add_input(program_input)
+        return machine.run_until_input()
+
+    print(">>> Start Benchmark Intcode:")
+    boost_profiler = IntcodeProfiler(jumps=True)
+    boost = IntcodeMachine(puzzle_input)
+    boost.profiler = boost_profiler
+    boost.add_input([2])
+    boost.run()
+    steps = boost_profiler.steps()
+    print("BOOST (Day09 part 2) executes {} instructions".format(steps))
+    print("  opcodes: {}".format(dict(boost_profiler.opcodes.most_common())))
+    print("  hottest addresses: {}".format(boost_profiler.hottest(5)))
+    print("  hottest jumps: {}".format(boost_profiler.jumps.most_common(5)))
+    for name, runner in [
+        ("Day05", Day05.run_intcode_program),
+        ("List", run_with_memory(ListMemory)),
+        ("Paged", run_with_memory(PagedMemory)),
+        ("JIT", run_compiled),
+    ]:
+        duration = timeit(lambda: runner(puzzle_input.copy(), [2]), number=3) / 3
+        print("{:>8}: BOOST in {:.3f}s, {:.2f}M instructions/s".format(name, duration, steps / duration / 1e6))
+    print("End Benchmark Intcode<<<")
@@ -0,0 +1,312 @@
+import os
+import tempfile
+import unittest
+
+import Day05
+import Day09
+from intcode import (
+    PAGE_BITS,
+    PAGE_SIZE,
+    TRACE_ENTRY,
+    IntcodeMachine,
+    IntcodeProfiler,
+    IntcodeNetwork,
+    JitIntcodeMachine,
+    ListMemory,
+    PagedMemory,
+    decode_instruction,
+    read_trace,
+    run_intcode_program,
+)
+
+
+class TestIntcode(unittest.TestCase):
+    def test_decode_instruction(self):
+        for instruction, result in [
+            (1, (1, (0, 0, 0))),
+            (99, (99, (0, 0, 0))),
+            (1002, (2, (0, 1, 0))),
+            (21107, (7, (1, 1, 2))),
+            (204, (4, (2, 0, 0))),
+        ]:
+            with self.subTest(msg="instruction: {}".format(instruction)):
+                self.assertEqual(decode_instruction(instruction), result)
+
+    def test_decode_invalid_instruction(self):
+        for instruction in [0, 10, 398, 1301]:
+            with self.subTest(msg="instruction: {}".format(instruction)):
+                with self.assertRaises(ValueError):
+                    decode_instruction(instruction)
+
+    def test_same_results_as_day05(self):
+        for program, program_input in [
+            (Day05.puzzle_input, [1]),
+            (Day05.puzzle_input, [5]),
+            (Day09.puzzle_input, [1]),
+            ([109, 10, 204, -8, 99], []),
+            ([3, 9, 8, 9, 10, 9, 4, 9, 99, -1, 8], [8]),
+        ]:
+            with self.subTest(msg="input: {}".format(program_input)):
+                self.assertEqual(
+                    run_intcode_program(program.copy(), program_input.copy()),
+                    Day05.run_intcode_program(program.copy(), program_input.copy()),
+                )
+
+    def test_wait_for_input(self):
+        code = [3, 12, 3, 13, 1, 12, 13, 14, 4, 14, 99]
+        out, pointer, relative_base, code = run_intcode_program(code, [1])
+        self.assertListEqual(out, [])
+        self.assertEqual(pointer, 2)
+        self.assertEqual(relative_base, 0)
+        out, pointer, _, _ = run_intcode_program(code, [2], pointer_start=pointer)
+        self.assertListEqual(out, [3])
+        self.assertIsNone(pointer)
+
+    def test_memory_backends(self):
+        for memory in [ListMemory, PagedMemory]:
+            with self.subTest(msg="memory: {}".format(memory.__name__)):
+                mem = memory([1, 2, 3])
+                self.assertEqual(mem.read(1), 2)
+                self.assertEqual(mem.read(10**12), 0)
+                mem.write(1, -5)
+                mem.write(100, 7)
+                self.assertEqual(mem.read(1), -5)
+                self.assertEqual(mem.read(100), 7)
+                self.assertEqual(mem.read(99), 0)
+                with self.assertRaises(ValueError):
+                    mem.read(-1)
+                with self.assertRaises(ValueError):
+                    mem.write(-1, 0)
+
+    def test_paged_memory_far_write(self):
+        mem = PagedMemory([99])
+        mem.write(10**12, 42)
+        self.assertEqual(mem.read(10**12), 42)
+        self.assertEqual(len(mem.pages), 1)
+        self.assertEqual(sum(len(page) for page in mem.pages.values()), PAGE_SIZE)
+
+    def test_machine_memory_backends(self):
+        for memory in [ListMemory, PagedMemory]:
+            with self.subTest(msg="memory: {}".format(memory.__name__)):
+                machine = IntcodeMachine(Day09.puzzle_input.copy(), memory=memory)
+                machine.add_input([1])
+                self.assertTrue(machine.run())
+                self.assertListEqual(machine.output, [2316632620])
+
+    def test_machine_copies_program(self):
+        program = [1101, 1, 2, 0, 99]
+        machine = IntcodeMachine(program)
+        self.assertIsInstance(machine.memory, ListMemory)
+        machine.run()
+        self.assertListEqual(program, [1101, 1, 2, 0, 99])
+        self.assertEqual(machine.memory.read(0), 3)
+        IntcodeMachine(program, in_place=True).run()
+        self.assertListEqual(program, [3, 1, 2, 0, 99])
+
+    def test_machine_far_relative_write(self):
+        machine = IntcodeMachine([109, 10**12, 21101, 3, 4, 0, 204, 0, 99], memory=PagedMemory)
+        self.assertTrue(machine.run())
+        self.assertListEqual(machine.output, [7])
+        self.assertEqual(len(machine.memory.pages), 1)
+
+    def test_resumable_machine(self):
+        # add two inputs and output the sum, forever
+        machine = IntcodeMachine([3, 100, 3, 101, 1, 100, 101, 102, 4, 102, 4, 100, 1105, 1, 0])
+        self.assertListEqual(machine.run_until_input(), [])
+        machine.add_input([1, 2])
+        self.assertListEqual(machine.run_until_output(), [3])
+        self.assertListEqual(machine.run_until_output(5), [1])
+        self.assertFalse(machine.halted)
+        machine.add_input([10, 20, 30])
+        self.assertListEqual(machine.run_until_output(2), [30, 10])
+        self.assertListEqual(list(machine.input), [30])
+        self.assertListEqual(machine.run_until_input(), [])
+        self.assertListEqual(list(machine.input), [])
+        self.assertEqual(machine.pointer, 2)
+
+    def test_run_until_output_halted(self):
+        machine = IntcodeMachine([104, 1, 104, 2, 99])
+        self.assertListEqual(machine.run_until_output(1), [1])
+        self.assertListEqual(machine.run_until_output(3), [2])
+        self.assertTrue(machine.halted)
+        self.assertListEqual(machine.run_until_output(), [])
+
+    def test_network_chain(self):
+        increment = [3, 9, 1001, 9, 1, 9, 4, 9, 99, 0]
+        network = IntcodeNetwork.chain([increment] * 20, [[0]] + [[]] * 19, capacity=1)
+        network.run()
+        self.assertListEqual(network.output[19], [20])
+        self.assertTrue(all(stats.outputs == 1 for stats in network.stats.values()))
+        self.assertTrue(all(machine.halted for machine in network.machines.values()))
+
+    def test_network_ring(self):
+        feedback = [3, 26, 1001, 26, -4, 26, 3, 27, 1002, 27, 2, 27, 1, 27, 26, 27, 4, 27, 1001, 28, -1, 28, 1005, 28, 6]
+        feedback += [99, 0, 0, 5]
+        for capacity in [None, 1, 3]:
+            with self.subTest(msg="capacity: {}".format(capacity)):
+                network = IntcodeNetwork.ring([feedback] * 5, [[9, 0], [8], [7], [6], [5]], capacity)
+                network.run()
+                self.assertEqual(network.outbound[4][0].last, 139629729)
+                self.assertEqual(network.stats[4].outputs, 5)
+
+    def test_network_star(self):
+        hub = [104, 5, 3, 20, 3, 21, 1, 20, 21, 22, 4, 22, 99]
+        increment = [3, 9, 1001, 9, 1, 9, 4, 9, 99, 0]
+        network = IntcodeNetwork.star(hub, [increment, increment])
+        network.run()
+        self.assertEqual(network.outbound["hub"][0].last, 12)
+        self.assertEqual(network.stats["hub"].inputs, 2)
+
+    def test_network_deadlock(self):
+        network = IntcodeNetwork()
+        network.add_machine("waiting", [3, 0, 99])
+        with self.assertRaises(RuntimeError):
+            network.run()
+
+    def test_memory_copy(self):
+        for memory in [ListMemory, PagedMemory]:
+            with self.subTest(msg="memory: {}".format(memory.__name__)):
+                mem = memory([1, 2, 3])
+                mem.write(5000, 4)
+                other = mem.copy()
+                other.write(0, 10)
+                other.write(5000, 40)
+                mem.write(1, 20)
+                self.assertListEqual([mem.read(a) for a in [0, 1, 5000]], [1, 20, 4])
+                self.assertListEqual([other.read(a) for a in [0, 1, 5000]], [10, 2, 40])
+
+    def test_paged_memory_copy_on_write(self):
+        mem = PagedMemory([1, 2, 3])
+        mem.write(5000, 4)
+        mem.write(9000, 5)
+        other = mem.copy()
+        self.assertIs(other.image, mem.image)
+        other.write(5000, 40)
+        self.assertIsNot(other.pages[5000 >> PAGE_BITS], mem.pages[5000 >> PAGE_BITS])
+        self.assertIs(other.pages[9000 >> PAGE_BITS], mem.pages[9000 >> PAGE_BITS])
+
+    def test_fork(self):
+        machine = IntcodeMachine([3, 100, 3, 101, 1, 100, 101, 102, 4, 102, 4, 100, 1105, 1, 0])
+        machine.add_input([1])
+        machine.run_until_input()
+        fork = machine.fork()
+        machine.add_input([2])
+        fork.add_input([5])
+        self.assertListEqual(machine.run_until_output(2), [3, 1])
+        self.assertListEqual(fork.run_until_output(2), [6, 1])
+        self.assertEqual(machine.pointer, fork.pointer)
+
+    def test_jit_same_results(self):
+        for program, program_input in [
+            (Day05.puzzle_input, [1]),
+            (Day05.puzzle_input, [5]),
+            (Day09.puzzle_input, [1]),
+            (Day09.puzzle_input, [2]),
+            ([109, 1, 204, -1, 1001, 100, 1, 100, 1008, 100, 16, 101, 1006, 101, 0, 99], []),
+            ([3, 9, 8, 9, 10, 9, 4, 9, 99, -1, 8], [8]),
+            ([3, 3, 1105, -1, 9, 1101, 0, 0, 12, 4, 12, 99, 1], [0]),
+        ]:
+            with self.subTest(msg="input: {}".format(program_input)):
+                machine = IntcodeMachine(program)
+                machine.add_input(program_input)
+                jit_machine = JitIntcodeMachine(program)
+                jit_machine.add_input(program_input)
+                self.assertListEqual(jit_machine.run_until_input(), machine.run_until_input())
+                self.assertTrue(jit_machine.halted)
+
+    def test_jit_self_modifying(self):
+        # the output instruction increments its own operand until it is 3
+        program = [104, 0, 1001, 1, 1, 1, 1008, 1, 3, 20, 1006, 20, 0, 99]
+        machine = JitIntcodeMachine(program)
+        self.assertListEqual(machine.run_until_input(), [0, 1, 2])
+        self.assertTrue(machine.halted)
+        # input written into the code, a jump target
+        program = [3, 4, 1105, 1, 0, 104, 7, 99, 104, 8, 99]
+        for target, output in [(5, [7]), (8, [8])]:
+            with self.subTest(msg="target: {}".format(target)):
+                machine = JitIntcodeMachine(program)
+                machine.add_input([target])
+                self.assertListEqual(machine.run_until_input(), output)
+
+    def test_jit_resumable(self):
+        program = [3, 100, 3, 101, 1, 100, 101, 102, 4, 102, 4, 100, 1105, 1, 0]
+        machine = JitIntcodeMachine(program)
+        machine.add_input([1, 2])
+        self.assertListEqual(machine.run_until_output(), [3])
+        fork = machine.fork()
+        self.assertListEqual(machine.run_until_output(5), [1])
+        machine.add_input([10, 20])
+        fork.add_input([5, 6])
+        self.assertListEqual(machine.run_until_input(), [30, 10])
+        self.assertListEqual(fork.run_until_input(), [1, 11, 5])
+
+    def test_profiler(self):
+        # count down from 3, output every value
+        program = [104, 3, 1001, 1, -1, 1, 1005, 1, 0, 99]
+        for machine_class in [IntcodeMachine, JitIntcodeMachine]:
+            with self.subTest(msg="machine: {}".format(machine_class.__name__)):
+                machine = machine_class(program)
+                machine.profiler = IntcodeProfiler(jumps=True)
+                self.assertListEqual(machine.run_until_input(), [3, 2, 1])
+                self.assertEqual(machine.profiler.steps(), 10)
+                self.assertDictEqual(dict(machine.profiler.opcodes), {4: 3, 1: 3, 5: 3, 99: 1})
+                self.assertDictEqual(dict(machine.profiler.jumps), {(6, 0): 2})
+                self.assertListEqual(machine.profiler.hottest(1), [(0, 3)])
+
+    def test_profiler_fork(self):
+        program = [3, 100, 3, 101, 1, 100, 101, 102, 4, 102, 4, 100, 1105, 1, 0]
+        for machine_class in [IntcodeMachine, JitIntcodeMachine]:
+            with self.subTest(msg="machine: {}".format(machine_class.__name__)):
+                machine = machine_class(program)
+                machine.profiler = IntcodeProfiler()
+                machine.add_input([1, 2])
+                machine.run_until_output()
+                fork = machine.fork()
+                self.assertIsNone(fork.profiler)
+                fork.profiler = IntcodeProfiler()
+                fork.add_input([3, 4])
+                self.assertListEqual(fork.run_until_input(), [1, 7, 3])
+                self.assertEqual(machine.profiler.steps(), 4)
+                self.assertEqual(fork.profiler.steps(), 8)
+                machine.run_until_input()
+                self.assertEqual(machine.profiler.steps(), 6)
+                self.assertEqual(fork.profiler.steps(), 8)
+
+    def test_profiler_waiting_and_output_limit(self):
+        machine = IntcodeMachine([3, 100, 3, 101, 1, 100, 101, 102, 4, 102, 4, 100, 1105, 1, 0])
+        machine.profiler = IntcodeProfiler()
+        machine.add_input([1, 2])
+        self.assertListEqual(machine.run_until_output(), [3])
+        self.assertEqual(machine.profiler.steps(), 4)
+        machine.run_until_input()
+        self.assertEqual(machine.profiler.steps(), 6)
+        self.assertEqual(machine.profiler.addresses[0], 1)
+
+    def test_profiler_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_path = os.path.join(directory, "trace.bin")
+            machine = IntcodeMachine(Day09.puzzle_input)
+            machine.add_input([1])
+            with IntcodeProfiler(trace_path=trace_path, buffer_size=64) as profiler:
+                machine.profiler = profiler
+                machine.run_until_input()
+            trace = list(read_trace(trace_path))
+            self.assertEqual(len(trace), profiler.steps())
+            self.assertEqual(os.path.getsize(trace_path), TRACE_ENTRY.size * profiler.steps())
+            self.assertTupleEqual(trace[0], (0, Day09.puzzle_input[0]))
+            self.assertTupleEqual(trace[-1][1:], (99,))
+
+    def test_profiler_trace_far_pointer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_path = os.path.join(directory, "trace.bin")
+            # write a halt past 2**32 and jump there
+            machine = IntcodeMachine([1101, 99, 0, 2**33, 1105, 1, 2**33], memory=PagedMemory)
+            with IntcodeProfiler(trace_path=trace_path) as profiler:
+                machine.profiler = profiler
+                machine.run()
+            self.assertTrue(machine.halted)
+            self.assertListEqual(list(read_trace(trace_path)), [(0, 1101), (4, 1105), (2**33, 99)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 from typing import List, Tuple
 from copy import deepcopy
 
+import numpy as np
+
 from helper.tuple import tuple_add_tuple
 
 mapping = {
@@ -75,20 +77,96 @@ def change_seats_states(data: List[List[int]], seeing: bool = False) -> List[Lis
     return new_data
 
 
+def _shift_row(row: np.ndarray, shift: int, fill: int) -> np.ndarray:
+    """row[c + shift] for every column c, fill where c + shift is outside of the row"""
+    shifted = np.full_like(row, fill)
+    if shift > 0:
+        shifted[:-shift] = row[shift:]
+    elif shift < 0:
+        shifted[-shift:] = row[:shift]
+    else:
+        shifted[:] = row
+    return shifted
+
+
+class SeatLayout:
+    """Seat automaton on numpy arrays
+
+    The seats a seat looks at are computed once as an index array, every round is then a gather
+    and a sum into two preallocated state buffers. Index nof_seats is an always empty sentinel.
+    """
+
+    def __init__(self, data: List[List[int]], seeing: bool = False):
+        self.grid = np.array(data, dtype=np.int8)
+        self.threshold = 5 if seeing else 4
+        seat_positions = self.grid >= 0
+        self.nof_seats = int(seat_positions.sum())
+        seat_ids = np.full(self.grid.shape, -1, dtype=np.int64)
+        seat_ids[seat_positions] = np.arange(self.nof_seats)
+        directions = [(l, k) for k in range(-1, 2) for l in range(-1, 2) if not (l == k == 0)]
+        # one contiguous row of seat ids per direction, so every gather reads sequentially
+        self.neighbors = np.stack(
+            [self._nearest_seats(seat_ids, direction, seeing)[seat_positions] for direction in directions]
+        ).astype(np.int32)
+        self.state = np.zeros(self.nof_seats + 1, dtype=np.uint8)
+        self.state[:-1] = self.grid[seat_positions] == 1
+        self._next_state = np.zeros_like(self.state)
+        self._gathered = np.zeros(self.nof_seats, dtype=np.uint8)
+        self._counts = np.zeros(self.nof_seats, dtype=np.uint8)
+
+    def _nearest_seats(self, seat_ids: np.ndarray, direction: Tuple[int, int], seeing: bool) -> np.ndarray:
+        """id of the adjacent (or first seen) seat in direction for every cell, nof_seats if there is none"""
+        d_row, d_col = direction
+        if d_row == 0:
+            # sweep over the columns instead of the rows
+            return self._nearest_seats(seat_ids.T, (d_col, d_row), seeing).T
+        nearest = np.full(seat_ids.shape, self.nof_seats, dtype=np.int64)
+        rows = range(seat_ids.shape[0] - 1, -1, -1) if d_row > 0 else range(seat_ids.shape[0])
+        for row in rows:
+            if not 0 <= row + d_row < seat_ids.shape[0]:
+                continue
+            candidates = _shift_row(seat_ids[row + d_row], d_col, -1)
+            behind = _shift_row(nearest[row + d_row], d_col, self.nof_seats) if seeing else self.nof_seats
+            nearest[row] = np.where(candidates >= 0, candidates, behind)
+        return nearest
+
+    def step(self) -> bool:
+        """Change all the seats simultaneously, return true if any seat changed"""
+        self._counts[:] = 0
+        for direction_neighbors in self.neighbors:
+            np.take(self.state, direction_neighbors, out=self._gathered)
+            self._counts += self._gathered
+        # (a) empty seats without occupied neighbors and (b) occupied seats below the threshold are occupied
+        self._next_state[:-1] = (self._counts == 0) | ((self.state[:-1] == 1) & (self._counts < self.threshold))
+        changed = not np.array_equal(self.state, self._next_state)
+        self.state, self._next_state = self._next_state, self.state
+        return changed
+
+    def run(self) -> int:
+        """Change the seats until nothing changes anymore, return the number of rounds"""
+        rounds = 0
+        while self.step():
+            rounds += 1
+        return rounds
+
+    def occupied(self) -> int:
+        """count how many seats are occupied"""
+        return int(self.state[:-1].sum())
+
+    def to_list(self) -> List[List[int]]:
+        """the layout in the format of load"""
+        grid = self.grid.copy()
+        grid[grid >= 0] = self.state[:-1]
+        return grid.tolist()
+
+
 def run_until_no_changes(
     data: List[List[int]], seeing: bool = False
 ) -> List[List[int]]:
     """Change all the seats until the same state appears twice"""
-    old_state = deepcopy(data)
-    while True:
-        state = change_seats_states(old_state, seeing)
-        # if both states are equal
-        if all(
-            all(state[i][j] == old_state[i][j] for j in range(len(state[i])))
-            for i in range(len(data))
-        ):
-            return old_state
-        old_state = deepcopy(state)
+    layout = SeatLayout(data, seeing)
+    layout.run()
+    return layout.to_list()
 
 
 def count_occupied_seats(data: List[List[int]]) -> int:
@@ -116,12 +194,35 @@ class Test2020Day11(unittest.TestCase):
                 self.assertListEqual(end, load(f2))
                 self.assertEqual(count_occupied_seats(end), occ)
 
+    def test_seat_layout(self):
+        for f1, seeing in [
+            ["data/11-test.txt", False],
+            ["data/11-test.txt", True],
+            ["data/11-test1.txt", True],
+        ]:
+            with self.subTest(file=f1, seeing=seeing):
+                layout = SeatLayout(load(f1), seeing)
+                self.assertListEqual(layout.to_list(), load(f1))
+                layout.step()
+                self.assertListEqual(layout.to_list(), change_seats_states(load(f1), seeing))
+
+    def test_seen_seats(self):
+        # the middle seat sees the seats at the end of every row, column and diagonal
+        layout = SeatLayout([[0, -1, 0], [-1, 0, -1], [0, -1, 0]], seeing=True)
+        self.assertListEqual(sorted(layout.neighbors[:, 2].tolist()), [0, 1, 3, 4, 5, 5, 5, 5])
+        layout = SeatLayout([[0, -1, -1, 0, 0]], seeing=True)
+        self.assertListEqual(sorted(layout.neighbors[:, 1].tolist()), [0, 2, 3, 3, 3, 3, 3, 3])
+
 
 if __name__ == "__main__":
     print(">>> Start Main 11:")
     puzzle_input = load("data/11.txt")
     print("Part 1):")
-    print(count_occupied_seats(run_until_no_changes(puzzle_input)))
+    layout = SeatLayout(puzzle_input)
+    layout.run()
+    print(layout.occupied())
     print("Part 2):")
-    print(count_occupied_seats(run_until_no_changes(puzzle_input, seeing=True)))
+    layout = SeatLayout(puzzle_input, seeing=True)
+    layout.run()
+    print(layout.occupied())
     print("End Main 11<<<")
@@ -1,5 +1,5 @@
 import unittest
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 
 
 def load_data(filepath: str) -> List[tuple]:
@@ -87,6 +87,95 @@ def run_variant2(code: List[tuple]) -> Dict[int, int]:
     return mem
 
 
+def parse_mask(mask: str) -> Tuple[int, int]:
+    """Parse a mask once into an or-mask of the 1 bits and a mask of the floating X bits"""
+    return int(mask.replace("X", "0"), 2), int(mask.replace("1", "0").replace("X", "1"), 2)
+
+
+def run_init_program_bits(code: List[tuple]) -> Dict[int, int]:
+    """Run the init program on integers, the mask keeps X bits and overwrites the others"""
+    ones, floating = parse_mask("X" * 36)
+    mem = {}
+    for cmd in code:
+        if cmd[0] == "mask":
+            ones, floating = parse_mask(cmd[1])
+        elif cmd[0] == "mem":
+            mem[cmd[1]] = (cmd[2] & floating) | ones
+        else:
+            raise Exception("Command {} not expected".format(cmd[0]))
+    return mem
+
+
+def floating_addresses(address: int, ones: int, floating: int) -> Iterator[int]:
+    """All addresses of the decoded address, by iterating over the subsets of the floating bits"""
+    base = (address | ones) & ~floating
+    sub = floating
+    while True:
+        yield base | sub
+        if sub == 0:
+            return
+        sub = (sub - 1) & floating
+
+
+def run_variant2_bits(code: List[tuple]) -> Dict[int, int]:
+    """Run the program with floating values on integers"""
+    ones, floating = parse_mask("0" * 36)
+    mem = {}
+    for cmd in code:
+        if cmd[0] == "mask":
+            ones, floating = parse_mask(cmd[1])
+        elif cmd[0] == "mem":
+            for address in floating_addresses(cmd[1], ones, floating):
+                mem[address] = cmd[2]
+        else:
+            raise Exception("Command {} not expected".format(cmd[0]))
+    return mem
+
+
+def intersect_patterns(first: Tuple[int, int], second: Tuple[int, int]):
+    """Intersection of two (fixed bits, floating bits) address patterns, None if they are disjoint"""
+    (fixed_1, floating_1), (fixed_2, floating_2) = first, second
+    if (fixed_1 ^ fixed_2) & ~floating_1 & ~floating_2:
+        return None
+    floating = floating_1 & floating_2
+    return (fixed_1 | fixed_2) & ~floating, floating
+
+
+def count_uncovered(pattern: Tuple[int, int], others: List[Tuple[int, int]]) -> int:
+    """Number of addresses of pattern that are in none of the other patterns"""
+    count = 1 << pattern[1].bit_count()
+    for i, other in enumerate(others):
+        # addresses in the overlap with other that are not already removed by an earlier other
+        overlap = intersect_patterns(pattern, other)
+        if overlap is not None:
+            count -= count_uncovered(overlap, others[:i])
+    return count
+
+
+def sum_floating_writes(code: List[tuple]) -> int:
+    """Sum of the memory after the program with floating values, without expanding the addresses
+
+    Every write is kept as a pattern. Going backwards, a write only counts for its addresses that
+    are not overwritten by a later write, so the memory stays linear in the number of writes.
+    """
+    writes = []
+    ones, floating = parse_mask("0" * 36)
+    for cmd in code:
+        if cmd[0] == "mask":
+            ones, floating = parse_mask(cmd[1])
+        elif cmd[0] == "mem":
+            writes.append((((cmd[1] | ones) & ~floating, floating), cmd[2]))
+        else:
+            raise Exception("Command {} not expected".format(cmd[0]))
+    total = 0
+    later = []
+    for pattern, value in reversed(writes):
+        if value:
+            total += value * count_uncovered(pattern, [p for p in later if intersect_patterns(pattern, p)])
+        later.append(pattern)
+    return total
+
+
 class Test2020Day14(unittest.TestCase):
     def test_v1(self):
         self.assertEqual(
@@ -101,14 +190,31 @@ class Test2020Day14(unittest.TestCase):
         d = run_variant2(load_data("data/14-test2.txt"))
         self.assertEqual(sum(c for c in d.values()), 208)
 
+    def test_bits(self):
+        self.assertTupleEqual(parse_mask("X1X0"), (0b0100, 0b1010))
+        self.assertEqual(
+            {key: int(value, 2) for key, value in run_init_program(load_data("data/14-test.txt")).items()},
+            run_init_program_bits(load_data("data/14-test.txt")),
+        )
+        self.assertListEqual(sorted(floating_addresses(42, *parse_mask("X1001X"))), [26, 27, 58, 59])
+        code = load_data("data/14.txt")
+        self.assertEqual(run_variant2_bits(code), run_variant2(code))
+
+    def test_symbolic(self):
+        self.assertEqual(sum_floating_writes(load_data("data/14-test2.txt")), 208)
+        code = load_data("data/14.txt")
+        self.assertEqual(sum_floating_writes(code), sum(run_variant2_bits(code).values()))
+        # 2^36 addresses would not fit into a dict
+        code = [("mask", "X" * 36), ("mem", 0, 1), ("mask", "X" * 35 + "1"), ("mem", 0, 2)]
+        self.assertEqual(sum_floating_writes(code), 2**35 + 2 * 2**35)
+
 
 if __name__ == "__main__":
     print(">>> Start Main 14:")
     puzzle_input = load_data("data/14.txt")
     print("Part 1):")
-    state = run_init_program(puzzle_input)
-    print(sum(int(c, 2) for c in state.values()))
+    state = run_init_program_bits(puzzle_input)
+    print(sum(state.values()))
     print("Part 2):")
-    variant = run_variant2(puzzle_input)
-    print((sum(c for c in variant.values())))
+    print(sum_floating_writes(puzzle_input))
     print("End Main 14<<<")
@@ -1,6 +1,17 @@
+import os
+import tempfile
+import time
 import unittest
+from array import array
 from typing import Dict, List, Tuple, Set
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # the compiled loop is optional
+    njit = None
+
 
 def get_nth_spoken(start: List[int], n: int) -> int:
     """play the elves game until char n"""
@@ -36,6 +47,103 @@ def get_nth_spoken_faster(start: List[int], n: int) -> int:
     return last_spoken
 
 
+def _play_memory_game(last_seen, turn: int, last: int, stop: int) -> int:
+    """play from turn until stop, last_seen holds the last turn of every number (0: never spoken)"""
+    while turn < stop:
+        seen = last_seen[last]
+        last_seen[last] = turn
+        last = turn - seen if seen else 0
+        turn += 1
+    return last
+
+
+_play_memory_game_compiled = njit(cache=True)(_play_memory_game) if njit is not None else None
+
+
+class MemoryGame:
+    """Elves game on a flat array of last seen turns, growing chunk by chunk
+
+    Spoken numbers are always smaller than the current turn, so after n turns the table never
+    needs more than n entries of 4 bytes. The state can be saved and restored between chunks.
+    """
+
+    def __init__(self, start: List[int], chunk_size: int = 1 << 20, compiled: bool = False):
+        self.chunk_size = chunk_size
+        self.compiled = compiled and _play_memory_game_compiled is not None
+        self.last_seen = self._new_table(max(start) + 1)
+        for i_start, val in enumerate(start[:-1]):
+            self.last_seen[val] = i_start + 1
+        self.turn = len(start)
+        self.last = start[-1]
+
+    def _new_table(self, size: int = 0, data: bytes = None):
+        """table of size zeros, or filled with the int32 values in data"""
+        if data is None:
+            data = bytes(4 * size)
+        if self.compiled:
+            return np.frombuffer(data, dtype=np.int32).copy()
+        table = array("i")
+        table.frombytes(data)
+        return table
+
+    def _reserve(self, size: int):
+        """make sure the table has at least size entries"""
+        missing = size - len(self.last_seen)
+        if missing > 0:
+            if self.compiled:
+                self.last_seen = np.concatenate((self.last_seen, np.zeros(missing, dtype=np.int32)))
+            else:
+                self.last_seen.frombytes(bytes(4 * missing))
+
+    def play(self, n: int) -> int:
+        """play until the n-th number is spoken and return it"""
+        play = _play_memory_game_compiled if self.compiled else _play_memory_game
+        while self.turn < n:
+            stop = min(n, self.turn + self.chunk_size)
+            self._reserve(stop)
+            self.last = int(play(self.last_seen, self.turn, self.last, stop))
+            self.turn = stop
+        return self.last
+
+    def save(self, path: str):
+        """write a checkpoint of the current state"""
+        with open(path, "wb") as checkpoint:
+            array("q", [self.turn, self.last]).tofile(checkpoint)
+            checkpoint.write(self.last_seen.tobytes())
+
+    @classmethod
+    def load(cls, path: str, chunk_size: int = 1 << 20, compiled: bool = False) -> "MemoryGame":
+        """continue a game from a checkpoint written by save, on the engine selected by compiled"""
+        game = cls([0], chunk_size, compiled)
+        with open(path, "rb") as checkpoint:
+            header = array("q")
+            header.fromfile(checkpoint, 2)
+            game.turn, game.last = header
+            game.last_seen = game._new_table(data=checkpoint.read())
+        return game
+
+
+def get_nth_spoken_array(start: List[int], n: int, compiled: bool = False) -> int:
+    """play the elves game in larger scale on a flat array"""
+    return MemoryGame(start, compiled=compiled).play(n)
+
+
+def benchmark(start: List[int], n: int) -> Dict[str, float]:
+    """seconds needed by the dict, array and (if numba is installed) compiled engine"""
+    engines = {
+        "dict": get_nth_spoken_faster,
+        "array": get_nth_spoken_array,
+    }
+    if _play_memory_game_compiled is not None:
+        engines["compiled"] = lambda start_numbers, nth: get_nth_spoken_array(start_numbers, nth, True)
+    timings = {}
+    for name, engine in engines.items():
+        time_start = time.perf_counter()
+        engine(start.copy(), n)
+        timings[name] = time.perf_counter() - time_start
+    return timings
+
+
 class Test2020Day15(unittest.TestCase):
     def test_nth_number(self):
         for start, n, res in [
@@ -77,6 +185,56 @@ class Test2020Day15(unittest.TestCase):
             with self.subTest():
                 self.assertEqual(get_nth_spoken_faster(start.copy(), n), res)
 
+    def test_array_engine(self):
+        for start, n in [
+            [[0, 3, 6], 4],
+            [[0, 3, 6], 10],
+            [[3, 1, 2], 2020],
+            [[12, 20, 0, 6, 1, 17, 7], 100000],
+        ]:
+            with self.subTest(start=start, n=n):
+                self.assertEqual(
+                    get_nth_spoken_array(start.copy(), n),
+                    get_nth_spoken_faster(start.copy(), n),
+                )
+                self.assertEqual(
+                    MemoryGame(start.copy(), chunk_size=7).play(n),
+                    get_nth_spoken_faster(start.copy(), n),
+                )
+
+    def test_checkpoint(self):
+        game = MemoryGame([0, 3, 6], chunk_size=1000)
+        game.play(1000)
+        self.assertEqual(len(game.last_seen), 1000)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "15.chk")
+            game.save(path)
+            restored = MemoryGame.load(path)
+        self.assertEqual(restored.play(2020), 436)
+        self.assertEqual(game.play(2020), 436)
+
+    def test_checkpoint_engine(self):
+        game = MemoryGame([0, 3, 6], chunk_size=1000)
+        game.play(1000)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "15.chk")
+            game.save(path)
+            restored = MemoryGame.load(path, compiled=True)
+        # without numba the array engine is used
+        self.assertEqual(restored.compiled, _play_memory_game_compiled is not None)
+        self.assertEqual(restored.play(2020), 436)
+
+    @unittest.skipIf(njit is None, "numba is not installed")
+    def test_compiled_engine(self):
+        for start, n in [
+            [[0, 3, 6], 2020],
+            [[12, 20, 0, 6, 1, 17, 7], 100000],
+        ]:
+            with self.subTest(start=start, n=n):
+                game = MemoryGame(start.copy(), chunk_size=777, compiled=True)
+                self.assertTrue(game.compiled)
+                self.assertEqual(game.play(n), get_nth_spoken_array(start.copy(), n))
+
 
 if __name__ == "__main__":
     print(">>> Start Main 15:")
@@ -84,5 +242,7 @@ if __name__ == "__main__":
     print("Part 1):")
     print(get_nth_spoken(puzzle_input.copy(), 2020))
     print("Part 2):")
-    print(get_nth_spoken_faster(puzzle_input.copy(), 30000000))
+    print(get_nth_spoken_array(puzzle_input.copy(), 30000000))
+    print("Benchmark (seconds):")
+    print(benchmark(puzzle_input, 3000000))
     print("End Main 15<<<")
@@ -1,7 +1,14 @@
+import math
 import unittest
+from collections import Counter
 from copy import deepcopy
+from functools import lru_cache
+from itertools import product
 
-from typing import List, Tuple, Union
+from typing import Dict, List, Set, Tuple, Union
+
+import numpy as np
+from scipy.signal import convolve
 
 from helper.tuple import tuple_add_tuple
 
@@ -196,6 +203,100 @@ def count_active_cubes_4d(data: List[List[List[List[bool]]]]) -> int:
     return sum(sum(sum(sum(a for a in z) for z in y) for y in x) for x in data)
 
 
+Cell = Tuple[int, ...]
+
+
+def symbols_to_cells(data: List[str], dim: int = 3) -> Set[Cell]:
+    """transform given data to the set of active cells, all extra dimensions are 0"""
+    return {
+        (r_i, c_i) + (0,) * (dim - 2)
+        for r_i, row in enumerate(data)
+        for c_i, char in enumerate(row)
+        if char == "#"
+    }
+
+
+@lru_cache(maxsize=None)
+def neighbor_offsets(dim: int) -> List[Cell]:
+    """all 3^dim - 1 offsets to the neighbors of a cell"""
+    return [offset for offset in product(range(-1, 2), repeat=dim) if any(offset)]
+
+
+def canonical_cell(cell: Cell) -> Cell:
+    """Representative of the mirror images of cell
+
+    The start is flat, so the extra dimensions stay symmetric under sign flips and permutations.
+    """
+    return cell[:2] + tuple(sorted(abs(value) for value in cell[2:]))
+
+
+@lru_cache(maxsize=None)
+def mirror_count(extra: Cell) -> int:
+    """number of cells that share the canonical extra coordinates"""
+    count = math.factorial(len(extra)) * 2 ** sum(1 for value in extra if value)
+    for value in set(extra):
+        count //= math.factorial(extra.count(value))
+    return count
+
+
+def run_cycle_sparse(active: Set[Cell], dim: int, symmetric: bool = False) -> Set[Cell]:
+    """Cubes change their state simultaneously, neighbors are counted by scattering from active cubes
+
+    With symmetric, active only holds canonical cells. A canonical cell c with mirror count |c|
+    adds |c| for each of its neighbors n, which is divided by |canonical(n)| in the end.
+    """
+    offsets = neighbor_offsets(dim)
+    neighbors: Dict[Cell, int] = Counter()
+    for cell in active:
+        weight = mirror_count(cell[2:]) if symmetric else 1
+        for offset in offsets:
+            neighbor = tuple(value + delta for value, delta in zip(cell, offset))
+            if symmetric:
+                neighbor = canonical_cell(neighbor)
+            neighbors[neighbor] += weight
+    new_active = set()
+    for cell, count in neighbors.items():
+        if symmetric:
+            count //= mirror_count(cell[2:])
+        # If a cube is active and exactly 2 or 3 of its neighbors are also active, the cube remains active.
+        # If a cube is inactive but exactly 3 of its neighbors are active, the cube becomes active.
+        if count == 3 or (count == 2 and cell in active):
+            new_active.add(cell)
+    return new_active
+
+
+def run_n_cycles_sparse(data: List[str], n: int = 6, dim: int = 3, symmetric: bool = True) -> int:
+    """Run n cycles in dim dimensions on the sparse engine, return the number of active cubes"""
+    active = symbols_to_cells(data, dim)
+    for _ in range(n):
+        active = run_cycle_sparse(active, dim, symmetric)
+    if symmetric:
+        return sum(mirror_count(cell[2:]) for cell in active)
+    return len(active)
+
+
+def run_cycle_dense(grid: np.ndarray) -> np.ndarray:
+    """Cubes change their state simultaneously, neighbors are counted by convolving the grid
+
+    The counts are int32, in 6 dimensions a cube has up to 728 neighbors.
+    """
+    kernel = np.ones((3,) * grid.ndim, dtype=np.int32)
+    kernel[(1,) * grid.ndim] = 0
+    neighbors = convolve(grid.astype(np.int32), kernel, mode="same")
+    return ((neighbors == 3) | ((neighbors == 2) & (grid == 1))).astype(np.uint8)
+
+
+def run_n_cycles_dense(data: List[str], n: int = 6, dim: int = 3) -> int:
+    """Run n cycles in dim dimensions by convolving a numpy grid, return the number of active cubes"""
+    plane = np.array([[char == "#" for char in row] for row in data], dtype=np.uint8)
+    grid = plane.reshape(plane.shape + (1,) * (dim - 2))
+    # every cycle the active region grows at most by one in every direction
+    grid = np.pad(grid, n + 1)
+    for _ in range(n):
+        grid = run_cycle_dense(grid)
+    return int(grid.sum())
+
+
 class Test2020Day17(unittest.TestCase):
     def test_simple_count_cube(self):
         self.assertEqual(
@@ -230,6 +331,45 @@ class Test2020Day17(unittest.TestCase):
                     nof_cubes, count_active_cubes_4d(run_n_cycles_4d(data, n))
                 )
 
+    def test_mirror_count(self):
+        for extra, count in [
+            [(), 1],
+            [(0,), 1],
+            [(1,), 2],
+            [(0, 1), 4],
+            [(1, 1), 4],
+            [(1, 2), 8],
+            [(0, 0, 2), 6],
+        ]:
+            with self.subTest(extra=extra):
+                self.assertEqual(mirror_count(extra), count)
+
+    def test_engines(self):
+        data = [".#.", "..#", "###"]
+        for dim, n, nof_cubes in [
+            [3, 6, 112],
+            [4, 6, 848],
+            [5, 2, None],
+            [6, 1, None],
+        ]:
+            with self.subTest(dim=dim, n=n):
+                result = run_n_cycles_sparse(data, n, dim, symmetric=False)
+                if nof_cubes is not None:
+                    self.assertEqual(result, nof_cubes)
+                self.assertEqual(run_n_cycles_sparse(data, n, dim, symmetric=True), result)
+                self.assertEqual(run_n_cycles_dense(data, n, dim), result)
+
+    def test_dense_many_neighbors(self):
+        # 259 and 258 active neighbors would wrap to 3 and 2 in uint8
+        for nof_neighbors, center in [[259, 0], [258, 1]]:
+            with self.subTest(nof_neighbors=nof_neighbors):
+                grid = np.zeros((3,) * 6, dtype=np.uint8)
+                flat = grid.reshape(-1)
+                neighbors = [i for i in range(flat.size) if i != flat.size // 2][:nof_neighbors]
+                flat[neighbors] = 1
+                flat[flat.size // 2] = center
+                self.assertEqual(run_cycle_dense(grid)[(1,) * 6], 0)
+
 
 if __name__ == "__main__":
     print(">>> Start Main 17:")
@@ -243,10 +383,10 @@ if __name__ == "__main__":
         "#.##.###",
         "#.#..##.",
     ]
-    puzzle_input_bool_3d = symbols_to_bool(puzzle_input, dim=3)
     print("Part 1):")
-    print(count_active_cubes_3d(run_n_cycles_3d(deepcopy(puzzle_input_bool_3d))))
+    print(run_n_cycles_sparse(puzzle_input, dim=3))
     print("Part 2):")
-    puzzle_input_bool_4d = symbols_to_bool(puzzle_input, dim=4)
-    print(count_active_cubes_4d(run_n_cycles_4d(deepcopy(puzzle_input_bool_4d))))
+    print(run_n_cycles_sparse(puzzle_input, dim=4))
+    print("6 dimensions:")
+    print(run_n_cycles_sparse(puzzle_input, dim=6))
     print("End Main 17<<<")
@@ -108,6 +108,59 @@ def check_rules_on_single_messages(
     return possible
 
 
+class RuleMatcher:
+    """Recognizer compiled from the rules of read_rules
+
+    A memoized recursive descent over (rule, position) returns every position at which a rule can
+    end, so loops like "8: 42 | 42 8" are matched exactly and every message is checked in
+    polynomial time. Rules must not be left recursive, e.g. "8: 8 42".
+    """
+
+    def __init__(self, rules: Dict[int, Union[str, List[Tuple[int, ...]]]], rule: int = 0):
+        self.rule = rule
+        self.terminals = {key: value for key, value in rules.items() if isinstance(value, str)}
+        self.alternatives = {key: value for key, value in rules.items() if not isinstance(value, str)}
+
+    def _ends(self, message: str, rule: int, position: int, cache: Dict[Tuple[int, int], Set[int]]) -> Set[int]:
+        """all positions in message where rule can end, if it starts at position"""
+        key = (rule, position)
+        if key in cache:
+            return cache[key]
+        if rule in self.terminals:
+            terminal = self.terminals[rule]
+            ends = {position + len(terminal)} if message.startswith(terminal, position) else set()
+        else:
+            ends = set()
+            for subrules in self.alternatives[rule]:
+                positions = {position}
+                for subrule in subrules:
+                    positions = {
+                        end
+                        for current in positions
+                        if current < len(message)
+                        for end in self._ends(message, subrule, current, cache)
+                    }
+                    if not positions:
+                        break
+                ends.update(positions)
+        cache[key] = ends
+        return ends
+
+    def matches(self, message: str) -> bool:
+        """true if the whole message matches the rule"""
+        return len(message) in self._ends(message, self.rule, 0, {})
+
+
+def check_messages(
+    messages: List[str],
+    rules: Dict[int, Union[str, List[Tuple[int, ...]]]],
+    rule: int = 0,
+) -> List[bool]:
+    """Checks every message with the compiled rules"""
+    matcher = RuleMatcher(rules, rule)
+    return [matcher.matches(message) for message in messages]
+
+
 class Test2020Day19(unittest.TestCase):
     rules = [
         "42: 9 14 | 10 1",
@@ -206,13 +259,25 @@ class Test2020Day19(unittest.TestCase):
         res = check_rules_on_single_messages(msgs, clean_rules, 0)
         self.assertEqual(sum(res), 12)
 
+    def test_rule_matcher(self):
+        rules = deepcopy(self.rules)
+        self.assertEqual(sum(check_messages(self.msgs, read_rules(rules))), 3)
+        rules.remove("8: 42")
+        rules.append("8: 42 | 42 8")
+        rules.remove("11: 42 31")
+        rules.append("11: 42 31 | 42 11 31")
+        matcher = RuleMatcher(read_rules(rules))
+        self.assertEqual(sum(matcher.matches(msg) for msg in self.msgs), 12)
+        self.assertFalse(matcher.matches(""))
+        self.assertTrue(RuleMatcher(read_rules(rules), 42).matches("bbabb"))
+
 
 if __name__ == "__main__":
     print(">>> Start Main 19:")
     puzzle_str_rules, puzzle_messages = load_from_file("data/19.txt")
     puzzle_rules = read_rules(puzzle_str_rules)
     print("Part 1):")
-    print(sum(check_rule_on_messages(puzzle_messages, puzzle_rules, 0)))
+    print(sum(check_messages(puzzle_messages, puzzle_rules, 0)))
     print("Part 2):")
     puzzle_rules_str_changed = puzzle_str_rules.copy()
     puzzle_rules_str_changed.remove("8: 42")
@@ -220,5 +285,5 @@ if __name__ == "__main__":
     puzzle_rules_str_changed.remove("11: 42 31")
     puzzle_rules_str_changed.append("11: 42 31 | 42 11 31")
     puzzle_rules_changed = read_rules(puzzle_rules_str_changed)
-    print(sum(check_rules_on_single_messages(puzzle_messages, puzzle_rules_changed, 0)))
+    print(sum(check_messages(puzzle_messages, puzzle_rules_changed, 0)))
     print("End Main 19<<<")
@@ -1,5 +1,6 @@
 import unittest
-from typing import Dict, List, Tuple, Set
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Set
 from copy import deepcopy
 
 
@@ -24,16 +25,17 @@ def load_player_cards(players: List[str]) -> List[List[int]]:
 
 def play_game(piles: List[List[int]]) -> (int, int, List[int]):
     """Play a game of combat, return winner id, nof turns and pile of winner"""
+    decks = [deque(pile) for pile in piles]
     n = 0
     winner = None
-    while not any(len(pile) == 0 for pile in piles):
-        round_cards = []
-        for pile in piles:
-            round_cards.append(pile.pop(0))
+    while all(decks):
+        round_cards = [deck.popleft() for deck in decks]
         winner = round_cards.index(max(round_cards))
         round_cards.sort(reverse=True)
-        piles[winner] = piles[winner] + round_cards
+        decks[winner].extend(round_cards)
         n += 1
+    for pile, deck in zip(piles, decks):
+        pile[:] = deck
     return winner, n, piles[winner]
 
 
@@ -43,43 +45,51 @@ def get_deck_score(deck: List[int]) -> int:
     return sum((i + 1) * card for i, card in enumerate(deck))
 
 
-def play_recursive_combat(piles: List[List[int]]) -> (int, List[int]):
-    """Play a game of recursive combat, return winner_id and winning pile"""
-    if len(piles) != 2:
-        raise Exception("more than 2 players not supported")
-    history = []
-    while not any(len(pile) == 0 for pile in piles):
+def _recursive_combat(
+    deck0: Deque[int], deck1: Deque[int], memo: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], int]
+) -> int:
+    """Play recursive combat on the decks in place and return the winner id"""
+    history: Set[Tuple[Tuple[int, ...], Tuple[int, ...]]] = set()
+    while deck0 and deck1:
         # check for same state
-        if piles in history:
-            return 0, piles[0]
-        # keep history up to date
-        history.append(deepcopy(piles))
-        draw0 = piles[0].pop(0)
-        draw1 = piles[1].pop(0)
-        if len(piles[0]) >= draw0 and len(piles[1]) >= draw1:  # play recursive combat
-            # get new lists
-            list0 = deepcopy(piles[0][:draw0])
-            list1 = deepcopy(piles[1][:draw1])
-            win_id, _ = play_recursive_combat([list0, list1])
-            if win_id == 0:
-                piles[0].append(draw0)
-                piles[0].append(draw1)
-            else:
-                piles[1].append(draw1)
-                piles[1].append(draw0)
+        state = (tuple(deck0), tuple(deck1))
+        if state in history:
+            return 0
+        history.add(state)
+        draw0 = deck0.popleft()
+        draw1 = deck1.popleft()
+        if len(deck0) >= draw0 and len(deck1) >= draw1:  # play recursive combat
+            sub_decks = (tuple(deck0)[:draw0], tuple(deck1)[:draw1])
+            if sub_decks not in memo:
+                memo[sub_decks] = _recursive_combat(deque(sub_decks[0]), deque(sub_decks[1]), memo)
+            win_id = memo[sub_decks]
         else:  # no recursion possible
-            # append cards of last round to state
-            if draw0 > draw1:
-                piles[0].append(draw0)
-                piles[0].append(draw1)
-            else:
-                piles[1].append(draw1)
-                piles[1].append(draw0)
-    # get winner and deck
-    if len(piles[0]) == 0:
-        return 1, piles[1]
-    else:
-        return 0, piles[0]
+            win_id = 0 if draw0 > draw1 else 1
+        if win_id == 0:
+            deck0.append(draw0)
+            deck0.append(draw1)
+        else:
+            deck1.append(draw1)
+            deck1.append(draw0)
+    return 0 if deck0 else 1
+
+
+def play_recursive_combat(
+    piles: List[List[int]], memo: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], int] = None
+) -> (int, List[int]):
+    """Play a game of recursive combat, return winner_id and winning pile
+
+    Sub-game winners are memoized by their starting decks in memo, which can be shared between games.
+    """
+    if len(piles) != 2:
+        raise Exception("more than 2 players not supported")
+    if memo is None:
+        memo = {}
+    decks = [deque(pile) for pile in piles]
+    winner = _recursive_combat(decks[0], decks[1], memo)
+    for pile, deck in zip(piles, decks):
+        pile[:] = deck
+    return winner, piles[winner]
 
 
 class Test2020Day22(unittest.TestCase):
@@ -98,6 +108,15 @@ class Test2020Day22(unittest.TestCase):
         self.assertListEqual(pile, [7, 5, 6, 2, 4, 1, 10, 8, 9, 3])
         self.assertEqual(get_deck_score(pile), 291)
 
+    def test_game_v2_infinite(self):
+        memo = {}
+        id, pile = play_recursive_combat([[43, 19], [2, 29, 14]], memo)
+        self.assertEqual(id, 0)
+        self.assertListEqual(pile, [43, 19])
+        id, pile = play_recursive_combat(deepcopy(self.players_cards), memo)
+        self.assertEqual(get_deck_score(pile), 291)
+        self.assertIn(((9, 8, 5, 2), (10, 1, 7)), memo)
+
 
 if __name__ == "__main__":
     print(">>> Start Main 22:")
@@ -1,7 +1,15 @@
 import unittest
+from array import array
 from typing import List
 from copy import deepcopy
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # the compiled loop is optional
+    njit = None
+
 
 def split_input(data: str) -> List[int]:
     """split the input string"""
@@ -95,6 +103,74 @@ def perform_n_moves_v2(cups: List[int], n: int = 100) -> List[int]:
     return new_cups
 
 
+def _play_cups(successor, current: int, n: int, max_label: int) -> int:
+    """Play n moves on the successor table in place, return the next current cup
+
+    Written without allocations or Python objects, so it can be compiled with numba as well.
+    """
+    for _ in range(n):
+        # pick up 3 right to current
+        first = successor[current]
+        second = successor[first]
+        third = successor[second]
+        successor[current] = successor[third]
+        # get destination cup (label - 1 if not in the 3 removed)
+        destination = current - 1 if current > 1 else max_label
+        while destination == first or destination == second or destination == third:
+            destination = destination - 1 if destination > 1 else max_label
+        # put removed cups clockwise of destination
+        successor[third] = successor[destination]
+        successor[destination] = first
+        current = successor[current]
+    return current
+
+
+_play_cups_compiled = njit(cache=True)(_play_cups) if njit is not None else None
+
+
+def successor_table(cups: List[int], total: int = 0, use_numpy: bool = False):
+    """Table with the label of the following cup at the index of every label, index 0 is unused
+
+    Cups up to total that are not in cups are appended in ascending order, as in part 2.
+    Each cup needs 4 bytes, as an array('I') or numpy uint32 array.
+    """
+    nof_cups = max(total, len(cups))
+    if use_numpy:
+        successor = np.arange(1, nof_cups + 2, dtype=np.uint32)
+    else:
+        successor = array("I", range(1, nof_cups + 2))
+    for label, following in zip(cups, cups[1:]):
+        successor[label] = following
+    if nof_cups > len(cups):
+        successor[cups[-1]] = len(cups) + 1
+        successor[nof_cups] = cups[0]
+    else:
+        successor[cups[-1]] = cups[0]
+    return successor
+
+
+def perform_n_moves_v3(cups: List[int], n: int = 100, total: int = 0, compiled: bool = True):
+    """Array version - Play the crabs game for n moves, returns the successor table
+
+    Uses the numba compiled loop if numba is installed and compiled is set.
+    """
+    use_compiled = compiled and _play_cups_compiled is not None
+    successor = successor_table(cups, total, use_numpy=use_compiled)
+    play = _play_cups_compiled if use_compiled else _play_cups
+    play(successor, cups[0], n, len(successor) - 1)
+    return successor
+
+
+def successor_to_cups(successor, main: int = 1) -> List[int]:
+    """get the cups in clockwise order, starting at main"""
+    new_cups = [main]
+    curr_cup = successor[main]
+    while curr_cup != main:
+        new_cups.append(int(curr_cup))
+        curr_cup = successor[curr_cup]
+    return new_cups
+
+
 class Test2020Day23(unittest.TestCase):
     test_str = "389125467"
     test = split_input(test_str)
@@ -125,13 +201,47 @@ class Test2020Day23(unittest.TestCase):
                 if n == 10:
                     self.assertTupleEqual(get_two_following(res_order), (9, 2))
 
-    def test_ten_million_moves(self):
-        n = 10000000
+    def test_n_moves_v3(self):
+        for n, result in [
+            [10, "92658374"],
+            [100, "67384529"],
+        ]:
+            with self.subTest():
+                res_order = successor_to_cups(perform_n_moves_v3(self.test, n))
+                self.assertEqual(get_one_and_following(res_order), result)
+                self.assertListEqual(res_order, perform_n_moves_v2(deepcopy(self.test), n))
+
+    def test_successor_table(self):
+        successor = successor_table(self.test, 12)
+        self.assertEqual(successor.itemsize, 4)
+        self.assertListEqual(successor_to_cups(successor, 3), self.test + [10, 11, 12])
+        numpy_successor = successor_table(self.test, 12, use_numpy=True)
+        self.assertListEqual(list(numpy_successor), list(successor))
+
+    def test_million_cups_v2(self):
+        n = 100000
+        successor = perform_n_moves_v3(self.test, n, total=1000000)
         self.assertTupleEqual(
             get_two_following(perform_n_moves_v2(deepcopy(self.test_million), n)),
-            (934001, 159792),
+            (successor[1], successor[successor[1]]),
         )
 
+    def test_ten_million_moves(self):
+        n = 10000000
+        successor = perform_n_moves_v3(self.test, n, total=1000000)
+        self.assertTupleEqual((successor[1], successor[successor[1]]), (934001, 159792))
+
+    @unittest.skipIf(njit is None, "numba is not installed")
+    def test_compiled(self):
+        for n in [10, 100, 100000]:
+            with self.subTest(n=n):
+                compiled = perform_n_moves_v3(self.test, n, total=1000, compiled=True)
+                self.assertIsInstance(compiled, np.ndarray)
+                self.assertListEqual(
+                    successor_to_cups(compiled),
+                    successor_to_cups(perform_n_moves_v3(self.test, n, total=1000, compiled=False)),
+                )
+
 
 if __name__ == "__main__":
     print(">>> Start Main 23:")
@@ -141,11 +251,8 @@ if __name__ == "__main__":
     part_1 = perform_n_moves(deepcopy(puzzle_input), 100)
     print(get_one_and_following(part_1))
     print("Part 2):")
-    puzzle_million = deepcopy(puzzle_input) + [
-        i for i in range(len(puzzle_input) + 1, 1000001)
-    ]
-    part_2 = perform_n_moves_v2(puzzle_million, n=10000000)
-    x, y = get_two_following(part_2)
+    part_2 = perform_n_moves_v3(puzzle_input, n=10000000, total=1000000)
+    x, y = part_2[1], part_2[part_2[1]]
     print(x, y)
     print(x * y)
     print("End Main 23<<<")
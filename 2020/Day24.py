@@ -1,7 +1,10 @@
 import unittest
+from collections import Counter
 from copy import deepcopy
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
 
 # s pos
 # e pos
@@ -16,6 +19,17 @@ directions = {
     "ne": (0.5, -1),
     "nw": (-0.5, -1),
 }
+# axial coordinates (q, r), every tile has integer coordinates
+axial_directions = {
+    "e": (1, 0),
+    "w": (-1, 0),
+    "se": (0, 1),
+    "sw": (-1, 1),
+    "ne": (1, -1),
+    "nw": (0, -1),
+}
+# neighbors of the center [1, 1], indexed by [r, q]
+hex_kernel = np.array([[0, 1, 1], [1, 0, 1], [1, 1, 0]], dtype=np.uint8)
 
 
 def follow_direction(dirs: str) -> Tuple[int, int]:
@@ -64,28 +78,88 @@ def get_adjacent_tile_colors(
     return adjacent
 
 
+def to_axial(tile: Tuple[float, int]) -> Tuple[int, int]:
+    """convert a tile of follow_direction to axial coordinates"""
+    return int(tile[0] - tile[1] / 2), int(tile[1])
+
+
+def from_axial(tile: Tuple[int, int]) -> Tuple[float, int]:
+    """convert axial coordinates to the coordinates of follow_direction"""
+    q, r = tile
+    return (q + r / 2 if r % 2 else q + r // 2), r
+
+
+def black_tiles(colored: Dict[Tuple[int, int], bool]) -> Set[Tuple[int, int]]:
+    """axial coordinates of all black tiles"""
+    return {to_axial(tile) for tile, black in colored.items() if black}
+
+
+def flip_tiles_sparse(black: Set[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+    """One day on the set of black tiles, neighbors are counted by scattering from black tiles"""
+    neighbors = Counter(
+        (q + dq, r + dr) for q, r in black for dq, dr in axial_directions.values()
+    )
+    # black tiles with 1 or 2 black neighbors stay black, white tiles with 2 black neighbors flip
+    return {
+        tile
+        for tile, count in neighbors.items()
+        if count == 2 or (count == 1 and tile in black)
+    }
+
+
+def black_tiles_after_n_days(black: Set[Tuple[int, int]], n: int = 100) -> Set[Tuple[int, int]]:
+    """the black tiles after n days, the memory only depends on the number of black tiles"""
+    for _ in range(n):
+        black = flip_tiles_sparse(black)
+    return black
+
+
+def hex_convolve(grid: np.ndarray) -> np.ndarray:
+    """number of black neighbors of every tile, tiles outside of the grid are white
+
+    The 3x3 hex kernel only has six ones, adding six shifted views is much faster than a generic convolution.
+    """
+    neighbors = np.zeros_like(grid)
+    rows, cols = grid.shape
+    for dr, dq in zip(*np.nonzero(hex_kernel)):
+        dr, dq = int(dr) - 1, int(dq) - 1
+        neighbors[max(0, -dr) : rows - max(0, dr), max(0, -dq) : cols - max(0, dq)] += grid[
+            max(0, dr) : rows + min(0, dr), max(0, dq) : cols + min(0, dq)
+        ]
+    return neighbors
+
+
+def count_black_after_n_days_dense(black: Set[Tuple[int, int]], n: int = 100) -> int:
+    """number of black tiles after n days on a numpy grid
+
+    The grid is allocated once, the simulated window grows by one tile per side every day.
+    """
+    if not black:
+        return 0
+    q_min = min(q for q, _ in black)
+    r_min = min(r for _, r in black)
+    grid = np.zeros(
+        (
+            max(r for _, r in black) - r_min + 2 * n + 1,
+            max(q for q, _ in black) - q_min + 2 * n + 1,
+        ),
+        dtype=np.uint8,
+    )
+    for q, r in black:
+        grid[r - r_min + n, q - q_min + n] = 1
+    for day in range(n):
+        border = n - day - 1
+        window = grid[border : grid.shape[0] - border, border : grid.shape[1] - border]
+        neighbors = hex_convolve(window)
+        window[...] = (neighbors == 2) | ((neighbors == 1) & (window == 1))
+    return int(grid.sum())
+
+
 def tile_colors_after_n_days(
     colored: Dict[Tuple[int, int], bool], n: int = 100
 ) -> Dict[Tuple[int, int], bool]:
-    """get the number of active tiles after n days"""
-    for _ in range(n):
-        # work on duplicate of data
-        new_colored = deepcopy(colored)
-        # add neighboring tiles
-        for tile in colored.keys():
-            for curr_dir in directions.values():
-                new = tuple_add_tuple(curr_dir, tile)
-                if not new in new_colored:
-                    new_colored[new] = False
-        # for every tile check adjacent tiles and calculate changes
-        for tile in new_colored.keys():
-            adjacent = get_adjacent_tile_colors(colored, tile)
-            if new_colored[tile] and (0 == adjacent[True] or adjacent[True] > 2):
-                new_colored[tile] = False
-            elif not new_colored[tile] and adjacent[True] == 2:
-                new_colored[tile] = True
-        colored = new_colored
-    return colored
+    """get the black tiles after n days"""
+    return {from_axial(tile): True for tile in black_tiles_after_n_days(black_tiles(colored), n)}
 
 
 class Test2020Day24(unittest.TestCase):
@@ -134,6 +208,25 @@ class Test2020Day24(unittest.TestCase):
                 colors = tile_colors_after_n_days(deepcopy(self.colors), n)
                 self.assertEqual(count_active(colors), count)
 
+    def test_axial(self):
+        for tile in follow_directions(deepcopy(self.test_dirs)):
+            with self.subTest(tile=tile):
+                self.assertEqual(from_axial(to_axial(tile)), tile)
+        self.assertEqual(to_axial(follow_direction("nwwswee")), (0, 0))
+        self.assertEqual(to_axial(follow_direction("esew")), (0, 1))
+
+    def test_engines(self):
+        black = black_tiles(self.colors)
+        for n, count in [
+            [0, 10],
+            [1, 15],
+            [10, 37],
+            [100, 2208],
+        ]:
+            with self.subTest(n=n):
+                self.assertEqual(len(black_tiles_after_n_days(black, n)), count)
+                self.assertEqual(count_black_after_n_days_dense(black, n), count)
+
 
 if __name__ == "__main__":
     print(">>> Start Main 24:")
@@ -142,6 +235,8 @@ if __name__ == "__main__":
     puzzle_dirs = follow_directions(deepcopy(puzzle_input))
     print(count_active(puzzle_dirs))
     print("Part 2):")
-    puzzle_colors = tile_colors_after_n_days(deepcopy(puzzle_dirs))
-    print(count_active(puzzle_colors))
+    puzzle_black = black_tiles(puzzle_dirs)
+    print(len(black_tiles_after_n_days(puzzle_black)))
+    print("After 1000 days:")
+    print(count_black_after_n_days_dense(puzzle_black, 1000))
     print("End Main 24<<<")